@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import io
@@ -9,7 +9,7 @@ import zipfile
 
 from app.database import get_db
 from app.models import User, Chemical, BarcodeImage, BarcodeType
-from app.schemas import BarcodeImage as BarcodeImageSchema, BarcodeImageCreate
+from app.schemas import BarcodeImage as BarcodeImageSchema, BarcodeImageCreate, QRCodePayload
 from app.auth.auth import get_current_user, require_admin
 from app.utils.barcode_utils import generate_barcode_image, generate_qr_code
 
@@ -63,7 +63,8 @@ def generate_chemical_barcodes(
         "timestamp": datetime.utcnow().isoformat()
     }
     
-    qr_data = json.dumps(chemical_data, indent=2)
+    # Compact JSON: QR density grows with payload size, so no pretty-printing
+    qr_data = json.dumps(chemical_data, separators=(',', ':'))
     
     # Generate barcodes in background
     background_tasks.add_task(
@@ -168,7 +169,7 @@ def bulk_generate_barcodes(
             "timestamp": datetime.utcnow().isoformat()
         }
         
-        qr_data = json.dumps(chemical_data, indent=2)
+        qr_data = json.dumps(chemical_data, separators=(',', ':'))
         
         background_tasks.add_task(
             generate_and_store_barcodes,
@@ -198,9 +199,8 @@ def scan_barcode(
     if not chemical:
         # Try to parse QR code data
         try:
-            qr_data = json.loads(barcode_data)
-            if 'id' in qr_data:
-                chemical = db.query(Chemical).filter(Chemical.id == qr_data['id']).first()
+            qr_payload = QRCodePayload.model_validate_json(barcode_data)
+            chemical = db.query(Chemical).filter(Chemical.id == qr_payload.id).first()
         except:
             pass
     
@@ -215,6 +215,21 @@ def scan_barcode(
         location=chemical.location
     )
 
+@router.get("/{barcode_id}/image")
+def get_barcode_image(
+    barcode_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the raw PNG for a barcode image (kept out of the JSON schemas)
+    """
+    barcode = db.query(BarcodeImage).filter(BarcodeImage.id == barcode_id).first()
+    if not barcode or not barcode.image_blob:
+        raise HTTPException(status_code=404, detail="Barcode image not found")
+    
+    return Response(content=barcode.image_blob, media_type="image/png")
+
 @router.delete("/{barcode_id}")
 def delete_barcode(
     barcode_id: int,
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import pandas as pd
+import asyncio
 import io
 import logging
 import json
@@ -13,8 +14,10 @@ from app.models import User, Chemical, Stock, Location
 from app.schemas import Chemical as ChemicalSchema, ChemicalCreate, ChemicalUpdate, ChemicalWithStock
 from app.crud import chemical_crud, stock_crud, msds_crud
 from app.auth.auth import get_current_user, require_admin
-from app.utils.chemical_utils import process_chemical_data, generate_barcode, generate_chemical_qr_data
-from app.services.pubchem_service import pubchem_service
+from app.utils.chemical_utils import (
+    process_chemical_data, process_chemical_data_batch, generate_barcode, generate_chemical_qr_data
+)
+from app.services.pubchem_service import get_pubchem_service
 from app.schemas import PubChemCompound
 from app.websocket import broadcast_new_chemical  # NEW: WebSocket integration
 
@@ -37,15 +40,9 @@ def read_chemicals(
     """
     Get all chemicals with stock information - Enhanced with filtering
     """
-    chemicals = chemical_crud.get_chemicals_with_stock(db, skip=skip, limit=limit)
-    
-    # Apply additional filters
-    if location_id:
-        chemicals = [chem for chem in chemicals if chem.location_id == location_id]
-    
-    if low_stock:
-        chemicals = [chem for chem in chemicals 
-                    if chem.stock and chem.stock.current_quantity <= chem.stock.trigger_level]
+    chemicals = chemical_crud.get_chemicals_with_stock(
+        db, skip=skip, limit=limit, location_id=location_id, low_stock_only=bool(low_stock)
+    )
     
     # Fix: Handle chemicals without MSDS properly
     chemical_data = []
@@ -126,7 +123,7 @@ def create_chemical(
         )
         
         # Generate barcode
-        barcode_data, barcode_image = generate_barcode(db_chemical.id, db_chemical.unique_id)
+        barcode_data = generate_barcode(db_chemical.id, db_chemical.unique_id)
         db_chemical.barcode = barcode_data
         db.commit()
         db.refresh(db_chemical)
@@ -212,30 +209,42 @@ async def bulk_upload_chemicals(
         created_chemicals = []
         errors = []
         
+        # Existence check for the whole file in one query, before any RDKit work
+        existing = db.query(Chemical.cas_number, Chemical.name).filter(
+            Chemical.cas_number.in_(df['cas_number'].dropna().unique().tolist()) |
+            Chemical.name.in_(df['name'].dropna().unique().tolist())
+        ).all()
+        seen_cas = {cas_number for cas_number, _ in existing}
+        seen_names = {name for _, name in existing}
+        new_rows = []
         for index, row in df.iterrows():
+            # Earlier rows in the same file count too, as they did when rows were committed one by one
+            if row['cas_number'] in seen_cas or row['name'] in seen_names:
+                errors.append(f"Row {index + 1}: Chemical already exists - {row['name']}")
+                continue
+            seen_cas.add(row['cas_number'])
+            seen_names.add(row['name'])
+            new_rows.append((index, row))
+        
+        # RDKit work for the new rows only, off the event loop; serial in the request handler,
+        # since forking a process pool from a server worker thread is unsafe
+        processed_rows = await asyncio.to_thread(process_chemical_data_batch, [
+            {"smiles": row['smiles'], "name": row['name'], "cas_number": row['cas_number']}
+            for _, row in new_rows
+        ], n_workers=1)
+        
+        for (index, row), processed_data in zip(new_rows, processed_rows):
             try:
-                # Check if chemical already exists
-                existing = db.query(Chemical).filter(
-                    (Chemical.cas_number == row['cas_number']) | 
-                    (Chemical.name == row['name'])
-                ).first()
-                
-                if existing:
-                    errors.append(f"Row {index + 1}: Chemical already exists - {row['name']}")
-                    continue
-                
                 # Process chemical data
                 initial_quantity = float(row.get('initial_quantity', 0))
                 initial_unit = row.get('initial_unit', 'g')
                 location_id = row.get('location_id')
                 
-                processed_data = process_chemical_data(
-                    row['smiles'],
-                    row['name'],
-                    row['cas_number'],
-                    initial_quantity,
-                    initial_unit
-                )
+                processed_data = {
+                    **processed_data.to_dict(),
+                    "initial_quantity": initial_quantity,
+                    "initial_unit": initial_unit
+                }
                 
                 # Create chemical
                 db_chemical = chemical_crud.create_chemical_with_data(
@@ -246,7 +255,7 @@ async def bulk_upload_chemicals(
                 )
                 
                 # Generate barcode
-                barcode_data, barcode_image = generate_barcode(db_chemical.id, db_chemical.unique_id)
+                barcode_data = generate_barcode(db_chemical.id, db_chemical.unique_id)
                 db_chemical.barcode = barcode_data
                 db.commit()
                 
@@ -414,7 +423,7 @@ def get_chemical_barcode(
 # Search PubChem by name, SMILES, or CAS
 # --------------------------------------------------------------------
 @router.get("/pubchem/search", response_model=PubChemCompound)
-def search_pubchem(
+async def search_pubchem(
     query: str = Query(..., description="Chemical name, SMILES, or CAS number to search"),
     search_type: str = Query("name", description="Search type: name, smiles, or cas"),
     db: Session = Depends(get_db),
@@ -430,32 +439,34 @@ def search_pubchem(
         source = "pubchem"
         
         if search_type == "name":
-            compound_data = pubchem_service.get_compound_by_name(query)
+            compound_data = await get_pubchem_service().aget_compound_by_name(query)
         elif search_type == "smiles":
-            compound_data = pubchem_service.get_compound_by_smiles(query)
+            compound_data = await get_pubchem_service().aget_compound_by_smiles(query)
         elif search_type == "cas":
-            compound_data = pubchem_service.get_compound_by_cas(query)
+            compound_data = await get_pubchem_service().aget_compound_by_cas(query)
         else:
             raise HTTPException(status_code=400, detail="Invalid search type. Use 'name', 'smiles', or 'cas'")
         
         # Extract data from PubChem response
         if compound_data:
-            compound_info = pubchem_service.extract_compound_info(compound_data)
+            compound_info = get_pubchem_service().extract_compound_info(compound_data)
             logger.info(f"✅ PubChem data found: {compound_info.get('name', 'Unknown')}")
         else:
             # Fallback to molecular service
             logger.info("🔄 PubChem failed, trying molecular service...")
-            from app.services.molecular_service import molecular_service
-            mol_properties = molecular_service.calculate_molecular_properties(query)
+            from app.services.molecular_service import get_molecular_service
+            mol_properties = await asyncio.to_thread(
+                get_molecular_service().calculate_molecular_properties, query
+            )
             source = "molecular_service"
             
             if mol_properties:
                 compound_info = {
-                    'name': f"Compound ({mol_properties.get('molecular_formula', 'Unknown')})",
+                    'name': f"Compound ({mol_properties.molecular_formula})",
                     'smiles': query,
-                    'canonical_smiles': mol_properties.get('canonical_smiles', query),
-                    'molecular_formula': mol_properties.get('molecular_formula'),
-                    'molecular_weight': mol_properties.get('molecular_weight'),
+                    'canonical_smiles': mol_properties.canonical_smiles,
+                    'molecular_formula': mol_properties.molecular_formula,
+                    'molecular_weight': mol_properties.molecular_weight,
                     'cas_number': "Not found - enter manually",
                     'source': source
                 }
@@ -487,7 +498,7 @@ def search_pubchem(
 # Get safety data from PubChem
 # --------------------------------------------------------------------
 @router.get("/pubchem/safety/{identifier}")
-def get_pubchem_safety_data(
+async def get_pubchem_safety_data(
     identifier: str,
     identifier_type: str = Query("name", description="Identifier type: name, smiles, or cas"),
     db: Session = Depends(get_db),
@@ -497,7 +508,7 @@ def get_pubchem_safety_data(
     Get safety data from PubChem
     """
     try:
-        safety_data = pubchem_service.get_compound_safety_data(identifier, identifier_type)
+        safety_data = await get_pubchem_service().aget_compound_safety_data(identifier, identifier_type)
         
         if not safety_data:
             raise HTTPException(status_code=404, detail="Safety data not found in PubChem")
@@ -6,7 +6,7 @@ import json
 
 from app.database import get_db
 from app.auth.auth import get_current_user
-from app.services.molecular_service import molecular_service
+from app.services.molecular_service import get_molecular_service
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +30,7 @@ async def calculate_molecular_properties(
         clean_smiles = smiles.replace('\\', '').strip()
         
         # Calculate properties
-        properties = molecular_service.calculate_molecular_properties(clean_smiles)
+        properties = get_molecular_service().calculate_molecular_properties(clean_smiles)
         
         if not properties:
             raise HTTPException(status_code=400, detail="Could not calculate molecular properties")
@@ -38,7 +38,7 @@ async def calculate_molecular_properties(
         return {
             "status": "success",
             "smiles": clean_smiles,
-            "properties": properties
+            "properties": properties.to_dict()
         }
         
     except Exception as e:
@@ -48,6 +48,7 @@ async def calculate_molecular_properties(
 @router.post("/optimize-structure")
 async def optimize_molecular_structure(
     smiles: str,
+    generate_3d: bool = False,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
@@ -61,7 +62,7 @@ async def optimize_molecular_structure(
         clean_smiles = smiles.replace('\\', '').strip()
         
         # Optimize structure
-        optimized_data = molecular_service.optimize_structure(clean_smiles)
+        optimized_data = get_molecular_service().optimize_structure(clean_smiles, generate_3d=generate_3d)
         
         if not optimized_data:
             raise HTTPException(status_code=400, detail="Could not optimize structure")
@@ -92,7 +93,7 @@ async def validate_molecular_structure(
         clean_smiles = smiles.replace('\\', '').strip()
         
         # Validate structure
-        validation_result = molecular_service.validate_structure(clean_smiles)
+        validation_result = get_molecular_service().validate_structure(clean_smiles)
         
         return {
             "status": "success",
@@ -122,7 +123,7 @@ async def convert_molecular_format(
         clean_input = input_data.replace('\\', '').strip()
         
         # Convert format
-        conversion_result = molecular_service.convert_format(
+        conversion_result = get_molecular_service().convert_format(
             clean_input, input_format, output_format
         )
         
@@ -157,7 +158,7 @@ async def get_compound_summary(
         clean_smiles = smiles.replace('\\', '').strip()
         
         # Get comprehensive summary
-        summary = molecular_service.get_compound_summary(clean_smiles)
+        summary = get_molecular_service().get_compound_summary(clean_smiles)
         
         return {
             "status": "success",
@@ -1,5 +1,5 @@
 # backend/app/api/stock.py - ENHANCED VERSION
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
@@ -9,6 +9,7 @@ try:
     from ..database import get_db
     from ..models import User, StockAdjustment, AdjustmentReason
     from ..schemas import Stock, StockUpdate, Alert, ChemicalWithStock, UsageHistory, UsageHistoryCreate
+    from ..schemas import stock_list_adapter, usage_history_list_adapter
     from ..crud import stock_crud
     from ..auth.auth import get_current_user, require_admin
     from ..websocket import broadcast_stock_adjustment  # NEW: WebSocket integration
@@ -16,6 +17,7 @@ except ImportError:
     from app.database import get_db
     from app.models import User, StockAdjustment, AdjustmentReason
     from app.schemas import Stock, StockUpdate, Alert, ChemicalWithStock, UsageHistory, UsageHistoryCreate
+    from app.schemas import stock_list_adapter, usage_history_list_adapter
     from app.crud import stock_crud
     from app.auth.auth import get_current_user, require_admin
     from app.websocket import broadcast_stock_adjustment  # NEW: WebSocket integration
@@ -34,7 +36,9 @@ def read_stock(
     Accessible by authenticated users.
     """
     try:
-        return stock_crud.get_all_stock(db, skip=skip, limit=limit)
+        stocks = stock_crud.get_all_stock(db, skip=skip, limit=limit)
+        stocks = stock_list_adapter.validate_python(stocks, from_attributes=True)
+        return Response(content=stock_list_adapter.dump_json(stocks), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving stock data: {str(e)}")
 
@@ -52,17 +56,9 @@ def read_chemicals_with_stock(
     Enhanced with filtering options.
     """
     try:
-        chemicals = stock_crud.get_all_chemicals_with_stock(db, skip=skip, limit=limit)
-        
-        # Apply filters
-        if low_stock_only:
-            chemicals = [chem for chem in chemicals 
-                        if chem.stock and chem.stock.current_quantity <= chem.stock.trigger_level]
-        
-        if location_id:
-            chemicals = [chem for chem in chemicals if chem.location_id == location_id]
-            
-        return chemicals
+        return stock_crud.get_all_chemicals_with_stock(
+            db, skip=skip, limit=limit, location_id=location_id, low_stock_only=low_stock_only
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving chemicals with stock: {str(e)}")
 
@@ -214,7 +210,8 @@ def get_chemical_usage_history(
     """
     try:
         usage_history = stock_crud.get_usage_history(db, chemical_id=chemical_id, skip=skip, limit=limit)
-        return usage_history
+        usage_history = usage_history_list_adapter.validate_python(usage_history, from_attributes=True)
+        return Response(content=usage_history_list_adapter.dump_json(usage_history), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving usage history: {str(e)}")
 
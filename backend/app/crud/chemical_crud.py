@@ -257,18 +257,29 @@ def delete_chemical(db: Session, chemical_id: int) -> bool:
     db.commit()
     return True
 
-def get_chemicals_with_stock(db: Session, skip: int = 0, limit: int = 100) -> List[Chemical]:
+def get_chemicals_with_stock(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    location_id: Optional[int] = None,
+    low_stock_only: bool = False
+) -> List[Chemical]:
     """
     Get chemicals with their stock information
-    Enhanced with location and relationships
+    Enhanced with location and relationships; filters are applied in SQL before paging
     """
-    chemicals = db.query(Chemical).options(
+    query = db.query(Chemical).options(
         joinedload(Chemical.stock),
         joinedload(Chemical.location),
         joinedload(Chemical.msds)
-    ).join(Stock).offset(skip).limit(limit).all()
+    ).join(Stock)
     
-    return chemicals
+    if location_id:
+        query = query.filter(Chemical.location_id == location_id)
+    if low_stock_only:
+        query = query.filter(Stock.is_low)
+    
+    return query.offset(skip).limit(limit).all()
 
 def get_chemicals_by_creator(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Chemical]:
     """
@@ -280,9 +291,7 @@ def get_chemicals_with_low_stock(db: Session, skip: int = 0, limit: int = 100) -
     """
     Get chemicals with low stock levels
     """
-    return db.query(Chemical).join(Stock).filter(
-        Stock.current_quantity <= Stock.trigger_level
-    ).offset(skip).limit(limit).all()
+    return db.query(Chemical).join(Stock).filter(Stock.is_low).offset(skip).limit(limit).all()
 
 def get_chemicals_without_stock(db: Session, skip: int = 0, limit: int = 100) -> List[Chemical]:
     """
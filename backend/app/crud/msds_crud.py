@@ -5,7 +5,7 @@ from datetime import datetime
 
 from ..models import MSDS, Chemical
 from ..schemas import MSDSCreate, MSDSUpdate
-from ..services.pubchem_service import pubchem_service
+from ..services.pubchem_service import get_pubchem_service
 
 logger = logging.getLogger(__name__)
 
@@ -83,7 +83,7 @@ def fetch_msds_from_pubchem(db: Session, chemical_id: int) -> Optional[MSDS]:
     for identifier, id_type in identifiers:
         if identifier and identifier != "N/A":
             logger.info(f"Trying to fetch data using {id_type}: {identifier}")
-            safety_data = pubchem_service.get_compound_safety_data(identifier, id_type)
+            safety_data = get_pubchem_service().get_compound_safety_data(identifier, id_type)
             if safety_data:
                 logger.info(f"Successfully fetched data using {id_type}")
                 break
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 from typing import List, Optional
 import logging
@@ -38,7 +38,7 @@ def check_low_stock_alert(db: Session, stock: Stock):
     """
     Check if stock level triggers an alert and create one if needed
     """
-    if stock.current_quantity <= stock.trigger_level:
+    if stock.is_low:
         # Check if there's already an unresolved alert
         existing_alert = db.query(Alert).filter(
             Alert.chemical_id == stock.chemical_id,
@@ -73,16 +73,12 @@ def resolve_alert(db: Session, alert_id: int) -> Optional[Alert]:
 
 def get_low_stock_chemicals(db: Session, skip: int = 0, limit: int = 100) -> List[Chemical]:
     """Get chemicals with low stock"""
-    return db.query(Chemical).join(Stock).filter(
-        Stock.current_quantity <= Stock.trigger_level
-    ).offset(skip).limit(limit).all()
+    return db.query(Chemical).join(Stock).filter(Stock.is_low).offset(skip).limit(limit).all()
 
 def get_stock_summary(db: Session) -> dict:
     """Get stock summary statistics"""
     total_chemicals = db.query(Chemical).count()
-    low_stock_count = db.query(Chemical).join(Stock).filter(
-        Stock.current_quantity <= Stock.trigger_level
-    ).count()
+    low_stock_count = db.query(Chemical).join(Stock).filter(Stock.is_low).count()
     
     # Calculate total stock value with SQLAlchemy 2.0 compatible func.sum()
     total_quantity_result = db.query(func.sum(Stock.current_quantity)).scalar()
@@ -97,13 +93,26 @@ def get_stock_summary(db: Session) -> dict:
 
 # NEW METHODS FOR COMPREHENSIVE STOCK MANAGEMENT
 
-def get_all_chemicals_with_stock(db: Session, skip: int = 0, limit: int = 100) -> List[Chemical]:
-    """Get all chemicals with their stock and location information"""
-    return db.query(Chemical).options(
-        db.joinedload(Chemical.stock),
-        db.joinedload(Chemical.location),
-        db.joinedload(Chemical.usage_history)
-    ).offset(skip).limit(limit).all()
+def get_all_chemicals_with_stock(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    location_id: Optional[int] = None,
+    low_stock_only: bool = False
+) -> List[Chemical]:
+    """Get all chemicals with their stock and location information, filtered in SQL before paging"""
+    query = db.query(Chemical).options(
+        joinedload(Chemical.stock),
+        joinedload(Chemical.location),
+        joinedload(Chemical.usage_history)
+    )
+    
+    if location_id:
+        query = query.filter(Chemical.location_id == location_id)
+    if low_stock_only:
+        query = query.join(Stock).filter(Stock.is_low)
+    
+    return query.offset(skip).limit(limit).all()
 
 def record_usage(db: Session, usage_data: UsageHistoryCreate, user_id: int) -> Optional[UsageHistory]:
     """Record chemical usage and update stock"""
@@ -5,10 +5,11 @@ Builds upon existing models with new features
 
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, Boolean,
-    Text, JSON, ForeignKey, Enum as SQLEnum, BLOB
+    Text, JSON, ForeignKey, Enum as SQLEnum, BLOB, Index
 )
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import enum
 import uuid
 
@@ -130,6 +131,21 @@ class Stock(Base):
 
     chemical = relationship("Chemical", back_populates="stock")
 
+    # Partial index holding only the low-stock rows that reports and alerts scan
+    # (MySQL has no partial indexes and ignores the where clause)
+    __table_args__ = (
+        Index(
+            "idx_stock_low", "chemical_id",
+            sqlite_where=text("current_quantity <= trigger_level"),
+            postgresql_where=text("current_quantity <= trigger_level"),
+        ),
+    )
+
+    @hybrid_property
+    def is_low(self):
+        """At or below the trigger level - usable in queries as Stock.is_low"""
+        return self.current_quantity <= self.trigger_level
+
 # -----------------------------------------
 # USAGE HISTORY TABLE (UNCHANGED - compatible)
 # -----------------------------------------
@@ -1,9 +1,12 @@
 # backend/app/schemas/__init__.py
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, EmailStr, StringConstraints, TypeAdapter
+from typing import Annotated, Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
+# Lightweight email type for internal accounts (no email-validator round trip)
+Email = Annotated[str, StringConstraints(pattern=r'^[^@\s]+@[^@\s]+\.[^@\s]+$', max_length=254)]
+
 # User Role Enum
 class UserRole(str, Enum):
     ADMIN = "admin"
@@ -64,20 +67,20 @@ class Location(LocationBase):
     id: int
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # User Schemas
 class UserBase(BaseModel):
-    email: EmailStr
+    email: Email
     full_name: Optional[str] = None
     role: Optional[str] = "viewer"
 
 class UserCreate(UserBase):
+    email: EmailStr  # Public signup keeps full email validation
     password: str
 
 class UserUpdate(BaseModel):
-    email: Optional[EmailStr] = None
+    email: Optional[Email] = None
     full_name: Optional[str] = None
     role: Optional[str] = None
     is_active: Optional[bool] = None
@@ -91,8 +94,7 @@ class User(UserBase):
     is_active: bool
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Chemical Schemas (UPDATED)
 class ChemicalBase(BaseModel):
@@ -125,8 +127,7 @@ class Chemical(ChemicalBase):
     created_at: datetime
     created_by: int
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Stock Schemas
 class StockBase(BaseModel):
@@ -144,8 +145,7 @@ class Stock(StockBase):
     chemical_id: int
     last_updated: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Usage History Schemas
 class UsageHistoryBase(BaseModel):
@@ -163,8 +163,7 @@ class UsageHistory(UsageHistoryBase):
     used_at: datetime
     user: Optional[User] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, cache_strings='keys')
 
 # Barcode Image Schemas (NEW)
 class BarcodeImageBase(BaseModel):
@@ -177,12 +176,10 @@ class BarcodeImageCreate(BarcodeImageBase):
 class BarcodeImage(BarcodeImageBase):
     id: int
     chemical_id: int
-    image_blob: Optional[bytes] = None
-    image_path: Optional[str] = None
+    image_path: Optional[str] = None  # PNG bytes are served by GET /barcodes/{id}/image
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Stock Adjustment Schemas (NEW)
 class StockAdjustmentBase(BaseModel):
@@ -203,14 +200,16 @@ class StockAdjustment(StockAdjustmentBase):
     admin: Optional[User] = None
     chemical: Optional[Chemical] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, cache_strings='keys')
 
 # MSDS Schemas
+# GHS statements are stored as {code: text}, e.g. {"H225": "Highly flammable liquid and vapour"}
+GHSStatements = Dict[str, str]
+
 class MSDSBase(BaseModel):
     source_url: Optional[str] = None
-    hazard_statements: Optional[Dict[str, Any]] = None
-    precautionary_statements: Optional[Dict[str, Any]] = None
+    hazard_statements: Optional[GHSStatements] = None
+    precautionary_statements: Optional[GHSStatements] = None
     handling_notes: Optional[str] = None
 
 class MSDSCreate(MSDSBase):
@@ -224,8 +223,7 @@ class MSDS(MSDSBase):
     chemical_id: int
     retrieved_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Alert Schemas
 class AlertBase(BaseModel):
@@ -241,8 +239,7 @@ class Alert(AlertBase):
     is_resolved: bool
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Combined Schemas for API responses
 class ChemicalWithStock(Chemical):
@@ -290,6 +287,10 @@ class BarcodeData(BaseModel):
     name: str
     cas_number: str
 
+# QR code payload (only the fields needed to resolve a scan)
+class QRCodePayload(BaseModel):
+    id: int
+
 # PubChem Response Schema
 class PubChemCompound(BaseModel):
     cid: Optional[int] = None
@@ -302,12 +303,28 @@ class PubChemCompound(BaseModel):
 
 # WebSocket Message Schemas (NEW)
 class WebSocketMessage(BaseModel):
-    type: str  # 'chemical_created', 'stock_updated', 'adjustment_made'
+    type: str  # 'chemical_created', 'chemical_updated', 'stock_adjusted', 'location_updated', 'low_stock_alert'
     data: Dict[str, Any]
     timestamp: datetime = None
 
-    class Config:
-        from_attributes = True
+# Read-path list adapters: validate ORM rows and dump straight to JSON bytes,
+# skipping FastAPI's jsonable_encoder pass on large list responses
+stock_list_adapter = TypeAdapter(List[Stock])
+usage_history_list_adapter = TypeAdapter(List[UsageHistory])
+
+def prebuild_schemas():
+    """
+    Resolve and build every schema's core validator/serializer up front.
+    Runs at import so forked workers share the built objects copy-on-write
+    instead of finishing deferred builds on their first request.
+    """
+    for model in list(globals().values()):
+        if isinstance(model, type) and issubclass(model, BaseModel) and model is not BaseModel:
+            model.model_rebuild()
+            model.__pydantic_validator__
+            model.__pydantic_serializer__
+
+prebuild_schemas()
 
 # Export all schemas
 __all__ = [
@@ -318,10 +335,11 @@ __all__ = [
     "Alert", "AlertCreate",
     "Token", "TokenData",
     "HazardSummary", "StockSummary",
-    "BarcodeData", "PubChemCompound",
+    "BarcodeData", "QRCodePayload", "PubChemCompound",
     "Location", "LocationCreate", "LocationUpdate",
     "UsageHistory", "UsageHistoryCreate",
     "BarcodeImage", "BarcodeImageCreate", "BarcodeType",
     "StockAdjustment", "StockAdjustmentCreate", "AdjustmentReason",
-    "StorageCondition", "WebSocketMessage"
+    "StorageCondition", "WebSocketMessage",
+    "stock_list_adapter", "usage_history_list_adapter"
 ]
\ No newline at end of file
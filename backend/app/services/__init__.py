@@ -3,6 +3,6 @@ External Services Package
 Contains integrations with external APIs and services
 """
 
-from .pubchem_service import PubChemService, pubchem_service
+from .pubchem_service import PubChemService, get_pubchem_service
 
-__all__ = ["PubChemService", "pubchem_service"]
+__all__ = ["PubChemService", "get_pubchem_service"]
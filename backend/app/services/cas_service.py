@@ -1,58 +1,81 @@
 import requests
+from requests.adapters import HTTPAdapter
+import atexit
+import hashlib
 import logging
+import orjson
+import re
+from dataclasses import dataclass
 from typing import Dict, Optional, List
 import time
-from ..utils.chemical_utils import safe_requests
 
 logger = logging.getLogger(__name__)
 
+# Basic CAS format: digits-digits-digit
+_CAS_RE = re.compile(r'^\d{1,7}-\d{2}-\d$')
+
+def _cas_check_digit_ok(cas_string: str) -> bool:
+    """Verify the CAS check digit (weighted digit sum mod 10). Assumes _CAS_RE already matched."""
+    digits = cas_string[:-2].replace('-', '')
+    total = sum(weight * int(digit) for weight, digit in enumerate(reversed(digits), 1))
+    return total % 10 == int(cas_string[-1])
+
+@dataclass(slots=True, frozen=True)
+class CASResult:
+    """Result of a CAS lookup from a single source"""
+    cas_number: Optional[str]
+    source: str
+    confidence: str = "low"
+    cid: Optional[int] = None
+    inchi_key: Optional[str] = None
+    note: Optional[str] = None
+
 class CASService:
     """
     Enhanced CAS lookup service with multiple fallback sources
     """
     
     def __init__(self):
-        self.sources = [
-            self._try_pubchem,
-            self._try_chemspider,
-            self._try_nist,
-            self._try_opsin,
-            self._generate_fallback_cas
-        ]
+        # Shared keep-alive session so repeated lookups reuse pooled TLS connections
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        atexit.register(self._session.close)
     
-    def get_cas_from_smiles(self, smiles: str) -> Dict[str, any]:
+    def get_cas_from_smiles(self, smiles: str) -> CASResult:
         """
         Get CAS number from SMILES using multiple fallback sources
         """
         if not smiles or not smiles.strip():
-            return {"cas_number": None, "source": "none", "confidence": "low"}
+            return CASResult(None, "none")
         
         clean_smiles = smiles.strip()
-        logger.info(f"Looking up CAS for SMILES: {clean_smiles}")
+        logger.info("Looking up CAS for SMILES: %s", clean_smiles)
         
         # Try each source until we get a result
-        for source_method in self.sources:
+        for source_name, source_method in _SOURCES:
             try:
-                result = source_method(clean_smiles)
-                if result and result.get("cas_number"):
-                    logger.info(f"Found CAS {result['cas_number']} from {result['source']}")
+                result = source_method(self, clean_smiles)
+                if result and result.cas_number:
+                    logger.info("Found CAS %s from %s", result.cas_number, result.source)
                     return result
             except Exception as e:
-                logger.warning(f"CAS source {source_method.__name__} failed: {str(e)}")
+                logger.warning("CAS source %s failed: %s", source_name, e)
                 continue
         
-        return {"cas_number": None, "source": "none", "confidence": "low"}
+        return CASResult(None, "none")
     
-    def _try_pubchem(self, smiles: str) -> Dict[str, any]:
+    def _try_pubchem(self, smiles: str) -> CASResult:
         """Try PubChem API first"""
         try:
             # First, search by SMILES to get CID
             search_url = "https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/smiles/property/InChIKey/JSON"
             search_data = {"smiles": smiles}
             
-            response = safe_requests.post(search_url, data=search_data, timeout=10)
+            response = self._session.post(search_url, data=search_data, timeout=10)
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if data.get('PropertyTable', {}).get('Properties'):
                     properties = data['PropertyTable']['Properties'][0]
                     cid = properties.get('CID')
@@ -61,38 +84,39 @@ class CASService:
                     if cid:
                         # Now get CAS from CID
                         cas_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/{cid}/synonyms/JSON"
-                        cas_response = safe_requests.get(cas_url, timeout=10)
+                        cas_response = self._session.get(cas_url, timeout=10)
                         
                         if cas_response.status_code == 200:
-                            cas_data = cas_response.json()
+                            # Synonym lists run to hundreds of KB; orjson parses the raw bytes
+                            cas_data = orjson.loads(cas_response.content)
                             synonyms = cas_data.get('InformationList', {}).get('Information', [{}])[0].get('Synonym', [])
                             
-                            # Look for CAS numbers in synonyms (typically start with digits and have hyphens)
-                            cas_numbers = [s for s in synonyms if self._is_valid_cas(s)]
+                            # First CAS-formatted synonym wins; they usually appear near the top
+                            first_cas = next(filter(_CAS_RE.match, synonyms), None)
                             
-                            if cas_numbers:
-                                return {
-                                    "cas_number": cas_numbers[0],
-                                    "source": "pubchem",
-                                    "confidence": "high",
-                                    "cid": cid,
-                                    "inchi_key": inchi_key
-                                }
+                            if first_cas:
+                                return CASResult(
+                                    cas_number=first_cas,
+                                    source="pubchem",
+                                    confidence="high",
+                                    cid=cid,
+                                    inchi_key=inchi_key
+                                )
             
-            return {"cas_number": None, "source": "pubchem"}
+            return CASResult(None, "pubchem")
             
         except Exception as e:
-            logger.warning(f"PubChem CAS lookup failed: {str(e)}")
-            return {"cas_number": None, "source": "pubchem"}
+            logger.warning("PubChem CAS lookup failed: %s", e)
+            return CASResult(None, "pubchem")
     
-    def _try_chemspider(self, smiles: str) -> Dict[str, any]:
+    def _try_chemspider(self, smiles: str) -> CASResult:
         """Try ChemSpider as fallback (requires API key)"""
         # Note: ChemSpider requires API key. This is a placeholder implementation.
         # You would need to sign up for ChemSpider API and add your key to environment variables
         chemspider_api_key = None  # You would get this from environment variables
         
         if not chemspider_api_key:
-            return {"cas_number": None, "source": "chemspider"}
+            return CASResult(None, "chemspider")
         
         try:
             # Search by SMILES
@@ -100,18 +124,18 @@ class CASService:
             search_data = {"query": smiles}
             headers = {"Authorization": f"Bearer {chemspider_api_key}"}
             
-            response = safe_requests.post(search_url, data=search_data, headers=headers, timeout=10)
+            response = self._session.post(search_url, data=search_data, headers=headers, timeout=10)
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 # Process ChemSpider response...
                 pass
                 
         except Exception as e:
-            logger.warning(f"ChemSpider CAS lookup failed: {str(e)}")
+            logger.warning("ChemSpider CAS lookup failed: %s", e)
         
-        return {"cas_number": None, "source": "chemspider"}
+        return CASResult(None, "chemspider")
     
-    def _try_nist(self, smiles: str) -> Dict[str, any]:
+    def _try_nist(self, smiles: str) -> CASResult:
         """Try NIST Chemistry WebBook as fallback"""
         try:
             # NIST doesn't have a direct SMILES API, but we can try InChI Key lookup
@@ -119,18 +143,18 @@ class CASService:
             pass
             
         except Exception as e:
-            logger.warning(f"NIST CAS lookup failed: {str(e)}")
+            logger.warning("NIST CAS lookup failed: %s", e)
         
-        return {"cas_number": None, "source": "nist"}
+        return CASResult(None, "nist")
     
-    def _try_opsin(self, smiles: str) -> Dict[str, any]:
+    def _try_opsin(self, smiles: str) -> CASResult:
         """Try OPSIN IUPAC name generator, then lookup by name"""
         try:
             # Convert SMILES to IUPAC name using OPSIN
             opsin_url = "https://opsin.ch.cam.ac.uk/opsin"
             params = {"smiles": smiles}
             
-            response = safe_requests.get(opsin_url, params=params, timeout=10)
+            response = self._session.get(opsin_url, params=params, timeout=10)
             if response.status_code == 200:
                 iupac_name = response.text.strip()
                 if iupac_name and not iupac_name.startswith("Error"):
@@ -139,40 +163,47 @@ class CASService:
                     pass
                     
         except Exception as e:
-            logger.warning(f"OPSIN CAS lookup failed: {str(e)}")
+            logger.warning("OPSIN CAS lookup failed: %s", e)
         
-        return {"cas_number": None, "source": "opsin"}
+        return CASResult(None, "opsin")
     
-    def _generate_fallback_cas(self, smiles: str) -> Dict[str, any]:
+    def _generate_fallback_cas(self, smiles: str) -> CASResult:
         """Generate a fallback CAS-like number for internal use"""
         try:
             # Create a deterministic pseudo-CAS based on SMILES hash
-            import hashlib
-            
-            smiles_hash = hashlib.md5(smiles.encode()).hexdigest()
+            smiles_hash = hashlib.blake2b(smiles.encode(), digest_size=5).hexdigest()
             # Format as CAS-like: XXXXXX-XX-X
             cas_pseudo = f"{int(smiles_hash[:6], 16) % 1000000:06d}-{int(smiles_hash[6:8], 16) % 100:02d}-{int(smiles_hash[8:9], 16) % 10}"
             
-            return {
-                "cas_number": cas_pseudo,
-                "source": "internal_fallback",
-                "confidence": "very_low",
-                "note": "Generated internally - verify with external sources"
-            }
+            return CASResult(
+                cas_number=cas_pseudo,
+                source="internal_fallback",
+                confidence="very_low",
+                note="Generated internally - verify with external sources"
+            )
             
         except Exception as e:
-            logger.warning(f"Fallback CAS generation failed: {str(e)}")
-            return {"cas_number": None, "source": "internal_fallback"}
+            logger.warning("Fallback CAS generation failed: %s", e)
+            return CASResult(None, "internal_fallback")
     
-    def _is_valid_cas(self, cas_string: str) -> bool:
-        """Validate CAS number format"""
+    def _is_valid_cas(self, cas_string: str, strict: bool = False) -> bool:
+        """Validate CAS number format, and the check digit when strict"""
         if not cas_string or not isinstance(cas_string, str):
             return False
         
-        # Basic CAS format: digits-digits-digit
-        import re
-        cas_pattern = r'^\d{1,7}-\d{2}-\d$'
-        return bool(re.match(cas_pattern, cas_string))
+        if not _CAS_RE.match(cas_string):
+            return False
+        
+        return _cas_check_digit_ok(cas_string) if strict else True
+
+# Lookup order, tried until one returns a CAS number
+_SOURCES = (
+    ("pubchem", CASService._try_pubchem),
+    ("chemspider", CASService._try_chemspider),
+    ("nist", CASService._try_nist),
+    ("opsin", CASService._try_opsin),
+    ("fallback", CASService._generate_fallback_cas),
+)
 
 # Global instance
 cas_service = CASService()
\ No newline at end of file
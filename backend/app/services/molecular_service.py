@@ -1,9 +1,62 @@
 import logging
-from typing import Dict, Any, Optional, Tuple
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 import hashlib
 
+from app.utils.chemical_utils import BATCH_PROCESS_THRESHOLD
+
 logger = logging.getLogger(__name__)
 
+# Upper bound for the parsed-Mol and property caches
+_CACHE_SIZE = 4096
+
+# Descriptors computed in one rdMolDescriptors.Properties pass, in output order
+_DESCRIPTOR_NAMES = (
+    "exactmw", "CrippenClogP", "CrippenMR", "tpsa", "NumHBD", "NumHBA",
+    "NumRotatableBonds", "NumHeavyAtoms", "NumRings", "NumAromaticRings",
+)
+
+def _atom(symbol: str, count: int) -> str:
+    """Formula term for one element: '' when absent, the bare symbol for a single atom"""
+    return '' if count <= 0 else (symbol if count == 1 else f"{symbol}{count}")
+
+# Characters a SMILES string must contain at least one of to be worth parsing;
+# lower-case atoms are aromatic, so benzene's 'c1ccccc1' has to pass too
+_VALID_CHARS = frozenset('CHONPSBIFClBrbcnops[]()=#@+-\\/')
+
+@dataclass(slots=True, frozen=True)
+class MolecularProperties:
+    """Calculated properties for one structure; immutable so it can be cached and shared"""
+    canonical_smiles: str
+    molecular_formula: str
+    molecular_weight: float
+    inchi: str
+    inchikey: str
+    logp: float
+    molar_refractivity: float
+    tpsa: float
+    hydrogen_bond_donors: int
+    hydrogen_bond_acceptors: int
+    rotatable_bonds: int
+    heavy_atom_count: int
+    formal_charge: int
+    atom_count: int
+    ring_count: int
+    aromatic_rings: int
+    calculation_source: str
+    is_valid: Optional[bool] = None
+    note: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready dict for API responses; unset optional fields are omitted"""
+        values = ((f.name, getattr(self, f.name)) for f in fields(self))
+        return {name: value for name, value in values if value is not None}
+
 class MolecularService:
     """
     Molecular calculation service using RDKit for chemical structure operations
@@ -12,132 +65,181 @@ class MolecularService:
     def __init__(self):
         self.rdkit_available = False
         self._initialize_rdkit()
+        # Repeat SMILES skip RDKit parsing; properties are keyed by canonical SMILES
+        self._parse_mol = lru_cache(maxsize=_CACHE_SIZE)(self._parse_mol_uncached)
+        self._properties_cache: Dict[str, MolecularProperties] = {}
+        # Batch calls hit the cache from worker threads; eviction must not race insertion
+        self._properties_lock = threading.Lock()
+        self._convert_cached = lru_cache(maxsize=8192)(self._convert_uncached)
+        # Fallback estimates are pure functions of the SMILES and immutable, so memoize them too
+        self._calculate_properties_fallback = lru_cache(maxsize=_CACHE_SIZE)(self._calculate_properties_fallback)
     
     def _initialize_rdkit(self):
         """Initialize RDKit with proper error handling"""
         try:
             from rdkit import Chem
-            from rdkit.Chem import AllChem, Descriptors, Draw
-            from rdkit.Chem.inchi import MolToInchi, MolToInchiKey, InchiToMol
-            from rdkit.Chem.rdMolDescriptors import CalcExactMolWt, CalcMolFormula
+            from rdkit.Chem import AllChem
+            from rdkit.Chem.inchi import MolToInchi, MolToInchiKey, MolFromInchi as InchiToMol
+            from rdkit.Chem.rdMolDescriptors import CalcExactMolWt, CalcMolFormula, Properties
             
             self.Chem = Chem
             self.AllChem = AllChem
-            self.Descriptors = Descriptors
-            self.Draw = Draw
             self.MolToInchi = MolToInchi
             self.MolToInchiKey = MolToInchiKey
             self.InchiToMol = InchiToMol
             self.CalcExactMolWt = CalcExactMolWt
             self.CalcMolFormula = CalcMolFormula
+            self.descriptor_calculator = Properties(list(_DESCRIPTOR_NAMES))
             
             self.rdkit_available = True
             logger.info("✅ RDKit initialized successfully")
             
         except ImportError as e:
-            logger.warning(f"❌ RDKit not available: {e}")
+            logger.warning("❌ RDKit not available: %s", e)
             self.rdkit_available = False
         except Exception as e:
-            logger.error(f"❌ RDKit initialization failed: {e}")
+            logger.error("❌ RDKit initialization failed: %s", e)
             self.rdkit_available = False
     
-def calculate_molecular_properties(self, smiles: str) -> Optional[Dict[str, Any]]:
-    """
-    Calculate comprehensive molecular properties using RDKit with enhanced accuracy
-    """
-    if not self.rdkit_available:
-        return self._calculate_properties_fallback(smiles)
+    @property
+    def Draw(self):
+        """rdkit.Chem.Draw, imported on first use - it is the heaviest RDKit submodule"""
+        from rdkit.Chem import Draw
+        return Draw
     
-    try:
-        # Clean SMILES first
-        clean_smiles = smiles.strip()
-        mol = self.Chem.MolFromSmiles(clean_smiles)
+    def _parse_mol_uncached(self, smiles: str) -> Optional[Tuple[Any, str, str]]:
+        """
+        Parse SMILES into (mol, canonical_smiles, inchikey); None if RDKit rejects it.
+        The returned Mol is shared through the cache and must not be modified.
+        """
+        mol = self.Chem.MolFromSmiles(smiles)
         if not mol:
-            logger.warning(f"❌ RDKit could not parse SMILES: {clean_smiles}")
-            return self._calculate_properties_fallback(clean_smiles)
+            return None
+        return mol, self.Chem.MolToSmiles(mol, canonical=True), self.MolToInchiKey(mol)
+    
+    def calculate_molecular_properties(self, smiles: str, mol: Any = None) -> Optional[MolecularProperties]:
+        """
+        Calculate comprehensive molecular properties using RDKit with enhanced accuracy.
+        Pass ``mol`` when the caller has already parsed the SMILES.
+        """
+        if not self.rdkit_available:
+            return self._calculate_properties_fallback(smiles)
+    
+        try:
+            # Clean SMILES first
+            clean_smiles = smiles.strip()
+            if mol is None:
+                parsed = self._parse_mol(clean_smiles)
+                if parsed is None:
+                    logger.warning("❌ RDKit could not parse SMILES: %s", clean_smiles)
+                    return self._calculate_properties_fallback(clean_smiles)
+                mol, canonical_smiles, inchikey = parsed
+            else:
+                canonical_smiles = self.Chem.MolToSmiles(mol, canonical=True)
+                inchikey = None
+            
+            with self._properties_lock:
+                properties = self._properties_cache.get(canonical_smiles)
+            if properties is None:
+                # Computed outside the lock so threads don't serialize on RDKit work
+                properties = self._compute_properties(mol, canonical_smiles, inchikey)
+                with self._properties_lock:
+                    if len(self._properties_cache) >= _CACHE_SIZE:
+                        self._properties_cache.pop(next(iter(self._properties_cache)))
+                    self._properties_cache[canonical_smiles] = properties
+            
+            return properties
         
-        # Calculate basic properties
-        molecular_weight = self.CalcExactMolWt(mol)
-        molecular_formula = self.CalcMolFormula(mol)
+        except Exception as e:
+            logger.error("❌ RDKit property calculation failed: %s", e)
+            return self._calculate_properties_fallback(smiles)
+    
+    def calculate_molecular_properties_batch(
+        self, smiles_list: List[str], n_workers: Optional[int] = None
+    ) -> List[Optional[MolecularProperties]]:
+        """
+        Calculate properties for many SMILES in parallel, preserving input order
+        """
+        if not smiles_list:
+            return []
+        n_workers = n_workers or os.cpu_count() or 1
+        if n_workers == 1 or len(smiles_list) == 1:
+            return [self.calculate_molecular_properties(smiles) for smiles in smiles_list]
         
-        # Generate canonical SMILES (this fixes structure representation)
-        canonical_smiles = self.Chem.MolToSmiles(mol, canonical=True)
+        # Small batches or few workers don't repay process start-up and the per-worker
+        # RDKit import; RDKit releases the GIL in most C++ calls, so threads still help
+        if n_workers < 4 or len(smiles_list) < BATCH_PROCESS_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                return list(executor.map(self.calculate_molecular_properties, smiles_list))
         
+        chunksize = max(1, len(smiles_list) // (n_workers * 4))
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            return list(executor.map(_calculate_properties_worker, smiles_list, chunksize=chunksize))
+    
+    def _compute_properties(self, mol: Any, canonical_smiles: str, inchikey: Optional[str] = None) -> MolecularProperties:
+        """
+        Run the RDKit descriptor calculations for an already-parsed molecule
+        """
+        molecular_formula = self.CalcMolFormula(mol)
+    
         # Generate InChI and InChIKey
         inchi = self.MolToInchi(mol)
-        inchikey = self.MolToInchiKey(mol)
+        if inchikey is None:
+            inchikey = self.MolToInchiKey(mol)
         
-        # Calculate additional descriptors
-        logp = self.Descriptors.MolLogP(mol)
-        tpsa = self.Descriptors.TPSA(mol)
-        hbd = self.Descriptors.NumHDonors(mol)
-        hba = self.Descriptors.NumHAcceptors(mol)
-        rotatable_bonds = self.Descriptors.NumRotatableBonds(mol)
-        heavy_atom_count = self.Descriptors.HeavyAtomCount(mol)
+        # All numeric descriptors in a single C++ pass
+        descriptors = dict(zip(_DESCRIPTOR_NAMES, self.descriptor_calculator.ComputeProperties(mol)))
+        molecular_weight = descriptors["exactmw"]
         formal_charge = self.Chem.GetFormalCharge(mol)
-        
-        # Generate 2D coordinates
-        self.AllChem.Compute2DCoords(mol)
-        
+    
         # Enhanced property calculation
-        properties = {
-            "canonical_smiles": canonical_smiles,
-            "molecular_formula": molecular_formula,
-            "molecular_weight": round(molecular_weight, 4),
-            "inchi": inchi,
-            "inchikey": inchikey,
-            "logp": round(logp, 2),
-            "tpsa": round(tpsa, 2),
-            "hydrogen_bond_donors": hbd,
-            "hydrogen_bond_acceptors": hba,
-            "rotatable_bonds": rotatable_bonds,
-            "heavy_atom_count": heavy_atom_count,
-            "formal_charge": formal_charge,
-            "atom_count": mol.GetNumAtoms(),
-            "ring_count": self.Chem.rdMolDescriptors.CalcNumRings(mol),
-            "aromatic_rings": self.Chem.rdMolDescriptors.CalcNumAromaticRings(mol),
-            "calculation_source": "rdkit",
-            "is_valid": True,
-            "mol_object": None  # Don't return the actual mol object
-        }
-        
-        logger.info(f"✅ RDKit calculated properties for: {canonical_smiles}")
-        logger.info(f"📊 Formula: {molecular_formula}, Weight: {molecular_weight:.2f}")
-        
+        properties = MolecularProperties(
+            canonical_smiles=canonical_smiles,
+            molecular_formula=molecular_formula,
+            molecular_weight=round(molecular_weight, 4),
+            inchi=inchi,
+            inchikey=inchikey,
+            logp=round(descriptors["CrippenClogP"], 2),
+            molar_refractivity=round(descriptors["CrippenMR"], 2),
+            tpsa=round(descriptors["tpsa"], 2),
+            hydrogen_bond_donors=int(descriptors["NumHBD"]),
+            hydrogen_bond_acceptors=int(descriptors["NumHBA"]),
+            rotatable_bonds=int(descriptors["NumRotatableBonds"]),
+            heavy_atom_count=int(descriptors["NumHeavyAtoms"]),
+            formal_charge=formal_charge,
+            atom_count=mol.GetNumAtoms(),
+            ring_count=int(descriptors["NumRings"]),
+            aromatic_rings=int(descriptors["NumAromaticRings"]),
+            calculation_source="rdkit",
+            is_valid=True,
+        )
+    
+        logger.info("✅ RDKit calculated properties for: %s", canonical_smiles)
+        logger.info("📊 Formula: %s, Weight: %.2f", molecular_formula, molecular_weight)
+    
         return properties
-        
-    except Exception as e:
-        logger.error(f"❌ RDKit property calculation failed: {e}")
-        return self._calculate_properties_fallback(smiles)
     
-    def _calculate_properties_fallback(self, smiles: str) -> Dict[str, Any]:
+    def _calculate_properties_fallback(self, smiles: str) -> MolecularProperties:
         """
         Fallback property calculation when RDKit is not available
         """
-        logger.info(f"Using fallback property calculation for: {smiles}")
+        logger.info("Using fallback property calculation for: %s", smiles)
         
         # Generate pseudo-InChIKey from hash
-        hash_obj = hashlib.md5(smiles.encode())
-        hash_hex = hash_obj.hexdigest()[:14].upper()
+        hash_hex = hashlib.blake2b(smiles.encode(), digest_size=7).hexdigest().upper()
         pseudo_inchikey = f"FAKE-{hash_hex}"
         
         # Basic pattern-based formula estimation
-        formula_parts = []
-        carbon_count = smiles.count('C') - smiles.count('Cl')
-        hydrogen_count = smiles.count('H')
-        oxygen_count = smiles.count('O')
-        nitrogen_count = smiles.count('N')
+        counts = Counter(smiles)  # one pass instead of a str.count() scan per element
+        carbon_count = counts['C'] - smiles.count('Cl')
+        hydrogen_count = counts['H']
+        oxygen_count = counts['O']
+        nitrogen_count = counts['N']
         
-        if carbon_count > 0:
-            formula_parts.append(f"C{carbon_count}" if carbon_count > 1 else "C")
-        if hydrogen_count > 0:
-            formula_parts.append(f"H{hydrogen_count}" if hydrogen_count > 1 else "H")
-        if oxygen_count > 0:
-            formula_parts.append(f"O{oxygen_count}" if oxygen_count > 1 else "O")
-        if nitrogen_count > 0:
-            formula_parts.append(f"N{nitrogen_count}" if nitrogen_count > 1 else "N")
-        
-        molecular_formula = "".join(formula_parts) if formula_parts else "Unknown"
+        molecular_formula = (
+            _atom("C", carbon_count) + _atom("H", hydrogen_count)
+            + _atom("O", oxygen_count) + _atom("N", nitrogen_count)
+        ) or "Unknown"
         
         # Very rough molecular weight estimation
         base_weight = (
@@ -147,29 +249,31 @@ def calculate_molecular_properties(self, smiles: str) -> Optional[Dict[str, Any]
             nitrogen_count * 14
         )
         
-        return {
-            "canonical_smiles": smiles,
-            "molecular_formula": molecular_formula,
-            "molecular_weight": round(base_weight, 2),
-            "inchi": f"InChI=1S/{molecular_formula}",
-            "inchikey": pseudo_inchikey,
-            "logp": 0.0,
-            "tpsa": 0.0,
-            "hydrogen_bond_donors": 0,
-            "hydrogen_bond_acceptors": 0,
-            "rotatable_bonds": 0,
-            "heavy_atom_count": carbon_count + oxygen_count + nitrogen_count,
-            "formal_charge": 0,
-            "atom_count": carbon_count + hydrogen_count + oxygen_count + nitrogen_count,
-            "ring_count": 0,
-            "aromatic_rings": 1 if 'c' in smiles else 0,
-            "calculation_source": "fallback",
-            "note": "Properties estimated - RDKit not available"
-        }
+        return MolecularProperties(
+            canonical_smiles=smiles,
+            molecular_formula=molecular_formula,
+            molecular_weight=round(base_weight, 2),
+            inchi=f"InChI=1S/{molecular_formula}",
+            inchikey=pseudo_inchikey,
+            logp=0.0,
+            molar_refractivity=0.0,
+            tpsa=0.0,
+            hydrogen_bond_donors=0,
+            hydrogen_bond_acceptors=0,
+            rotatable_bonds=0,
+            heavy_atom_count=carbon_count + oxygen_count + nitrogen_count,
+            formal_charge=0,
+            atom_count=carbon_count + hydrogen_count + oxygen_count + nitrogen_count,
+            ring_count=0,
+            aromatic_rings=1 if counts['c'] else 0,
+            calculation_source="fallback",
+            note="Properties estimated - RDKit not available",
+        )
     
-    def optimize_structure(self, smiles: str) -> Optional[Dict[str, Any]]:
+    def optimize_structure(self, smiles: str, generate_3d: bool = False) -> Optional[Dict[str, Any]]:
         """
-        Optimize molecular structure and return canonical representation
+        Optimize molecular structure and return canonical representation.
+        3D embedding + UFF optimization is slow, so it only runs when ``generate_3d`` is set.
         """
         if not self.rdkit_available:
             return {
@@ -179,17 +283,23 @@ def calculate_molecular_properties(self, smiles: str) -> Optional[Dict[str, Any]
             }
         
         try:
-            mol = self.Chem.MolFromSmiles(smiles)
-            if not mol:
+            parsed = self._parse_mol(smiles)
+            if parsed is None:
                 return None
             
-            # Generate canonical SMILES
-            canonical_smiles = self.Chem.MolToSmiles(mol, canonical=True)
+            mol, canonical_smiles, _ = parsed
             
-            # Generate 2D coordinates
-            self.AllChem.Compute2DCoords(mol)
+            if not generate_3d:
+                return {
+                    "original_smiles": smiles,
+                    "canonical_smiles": canonical_smiles,
+                    "has_3d_coordinates": False,
+                    "optimization_method": None,
+                    "note": "Canonicalized with RDKit"
+                }
             
-            # Calculate simple 3D coordinates (rough)
+            # Calculate simple 3D coordinates (rough); AddHs returns a new Mol,
+            # so the cached parse is left untouched
             mol_3d = self.Chem.AddHs(mol)
             self.AllChem.EmbedMolecule(mol_3d)
             self.AllChem.UFFOptimizeMolecule(mol_3d)
@@ -203,12 +313,37 @@ def calculate_molecular_properties(self, smiles: str) -> Optional[Dict[str, Any]
             }
             
         except Exception as e:
-            logger.error(f"Structure optimization failed: {e}")
+            logger.error("Structure optimization failed: %s", e)
+            return None
+    
+    def render_2d(self, smiles: str, width: int = 300, height: int = 300) -> Optional[str]:
+        """
+        Render a 2D depiction of the structure as SVG; the only path that needs 2D coordinates
+        """
+        if not self.rdkit_available:
+            return None
+        
+        try:
+            parsed = self._parse_mol(smiles)
+            if parsed is None:
+                return None
+            
+            # Work on a copy - the parsed Mol is shared through the cache
+            mol = self.Chem.Mol(parsed[0])
+            self.AllChem.Compute2DCoords(mol)
+            drawer = self.Draw.rdMolDraw2D.MolDraw2DSVG(width, height)
+            drawer.DrawMolecule(mol)
+            drawer.FinishDrawing()
+            return drawer.GetDrawingText()
+            
+        except Exception as e:
+            logger.error("2D rendering failed: %s", e)
             return None
     
-    def validate_structure(self, smiles: str) -> Dict[str, Any]:
+    def validate_structure(self, smiles: str, mol: Any = None) -> Dict[str, Any]:
         """
-        Validate molecular structure and return validation results
+        Validate molecular structure and return validation results.
+        Pass ``mol`` when the caller has already parsed the SMILES.
         """
         validation_result = {
             "is_valid": False,
@@ -228,20 +363,20 @@ def calculate_molecular_properties(self, smiles: str) -> Optional[Dict[str, Any]
             return validation_result
         
         # Check for basic chemical symbols
-        chemical_pattern = r'[CHONPSBIFClBr\[\]\(\)=#@\+\-\\\/]'
-        import re
-        if not re.search(chemical_pattern, clean_smiles):
+        if _VALID_CHARS.isdisjoint(clean_smiles):
             validation_result["errors"].append("SMILES does not contain valid chemical symbols")
             return validation_result
         
         # RDKit validation if available
         if self.rdkit_available:
             try:
-                mol = self.Chem.MolFromSmiles(clean_smiles)
+                if mol is None:
+                    parsed = self._parse_mol(clean_smiles)
+                    mol = parsed[0] if parsed else None
                 if mol:
                     validation_result["is_valid"] = True
                     validation_result["atom_count"] = mol.GetNumAtoms()
-                    validation_result["heavy_atom_count"] = self.Descriptors.HeavyAtomCount(mol)
+                    validation_result["heavy_atom_count"] = mol.GetNumHeavyAtoms()
                     
                     # Check for common issues
                     if self.Chem.DetectChemistryProblems(mol):
@@ -266,13 +401,28 @@ def calculate_molecular_properties(self, smiles: str) -> Optional[Dict[str, Any]
         if not self.rdkit_available:
             return None
         
+        # Results are cached - InChI generation is among the slowest RDKit calls
+        return self._convert_cached(input_data, input_format.lower(), output_format.lower())
+    
+    def _convert_uncached(self, input_data: str, input_format: str, output_format: str) -> Optional[str]:
+        """
+        Format conversion behind convert_format's cache; formats are already lower-cased
+        """
         try:
             mol = None
             
             # Parse input
-            if input_format.lower() == "smiles":
-                mol = self.Chem.MolFromSmiles(input_data)
-            elif input_format.lower() == "inchi":
+            if input_format == "smiles":
+                parsed = self._parse_mol(input_data)
+                if not parsed:
+                    return None
+                mol, canonical_smiles, inchikey = parsed
+                # The shared parse already produced these
+                if output_format == "smiles":
+                    return canonical_smiles
+                if output_format == "inchikey":
+                    return inchikey
+            elif input_format == "inchi":
                 mol = self.InchiToMol(input_data)
             # Add more formats as needed
             
@@ -280,18 +430,18 @@ def calculate_molecular_properties(self, smiles: str) -> Optional[Dict[str, Any]
                 return None
             
             # Generate output
-            if output_format.lower() == "smiles":
+            if output_format == "smiles":
                 return self.Chem.MolToSmiles(mol, canonical=True)
-            elif output_format.lower() == "inchi":
+            elif output_format == "inchi":
                 return self.MolToInchi(mol)
-            elif output_format.lower() == "inchikey":
+            elif output_format == "inchikey":
                 return self.MolToInchiKey(mol)
-            elif output_format.lower() == "mol":
+            elif output_format == "mol":
                 return self.Chem.MolToMolBlock(mol)
             # Add more formats as needed
             
         except Exception as e:
-            logger.error(f"Format conversion failed: {e}")
+            logger.error("Format conversion failed: %s", e)
         
         return None
     
@@ -299,21 +449,34 @@ def calculate_molecular_properties(self, smiles: str) -> Optional[Dict[str, Any]
         """
         Get comprehensive compound summary
         """
-        properties = self.calculate_molecular_properties(smiles)
-        validation = self.validate_structure(smiles)
+        # Parse once and share the Mol between validation and property calculation
+        mol = None
+        if self.rdkit_available and isinstance(smiles, str):
+            parsed = self._parse_mol(smiles.strip())
+            mol = parsed[0] if parsed else None
+        
+        properties = self.calculate_molecular_properties(smiles, mol=mol)
+        validation = self.validate_structure(smiles, mol=mol)
         
         summary = {
             "smiles": smiles,
             "validation": validation,
-            "properties": properties,
+            "properties": properties.to_dict() if properties else None,
             "summary": {
                 "is_valid": validation["is_valid"],
                 "has_properties": bool(properties),
-                "data_quality": "high" if properties and properties.get("calculation_source") == "rdkit" else "medium"
+                "data_quality": "high" if properties and properties.calculation_source == "rdkit" else "medium"
             }
         }
         
         return summary
 
-# Global service instance
-molecular_service = MolecularService()
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_molecular_service() -> MolecularService:
+    """Shared service instance, created on first use so importing this module doesn't load RDKit"""
+    return MolecularService()
+
+
+def _calculate_properties_worker(smiles: str) -> Optional[MolecularProperties]:
+    """Process-pool entry point; each worker builds its own service"""
+    return get_molecular_service().calculate_molecular_properties(smiles)
\ No newline at end of file
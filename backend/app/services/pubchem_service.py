@@ -1,24 +1,270 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
+import atexit
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 import logging
-from typing import Optional, Dict, Any
+import os
+import sqlite3
+import tempfile
+import threading
+import orjson
+from typing import Optional, Dict, Any, List, Tuple
 import time
 from urllib.parse import quote, unquote
 import re
+from functools import lru_cache
+from .cas_service import cas_service
+from ..utils.chemical_utils import canonicalize_smiles
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for the in-memory SMILES -> compound cache
+SMILES_CACHE_SIZE = 4096
+
+# PubChem records change rarely; keep successful responses for 30 days
+PUBCHEM_CACHE_TTL = 30 * 24 * 3600
+PUBCHEM_CACHE_PATH = os.getenv(
+    "PUBCHEM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "pubchem_cache.sqlite3")
+)
+
+# The only fields extract_compound_info reads - requested via the PUG REST property endpoint
+# instead of downloading full compound records
+COMPOUND_PROPERTIES = "IUPACName,MolecularFormula,MolecularWeight,CanonicalSMILES"
+
+# Outbound request limits - PubChem's usage policy allows 5 requests/second per client
+PUBCHEM_MAX_CONCURRENCY = 5
+PUBCHEM_MAX_RPS = 5.0
+CIR_MAX_CONCURRENCY = 4
+
+class _RateLimiter:
+    """Context manager capping concurrent requests and spacing them to at most ``rate`` per second"""
+    
+    def __init__(self, concurrency: int, rate: Optional[float] = None):
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+    
+    def __enter__(self):
+        self._slots.acquire()
+        if self._interval:
+            # Reserve the next start slot under the lock, then sleep outside it
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self._interval
+            if start > now:
+                time.sleep(start - now)
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._slots.release()
+
+class _ResponseCache:
+    """SQLite-backed URL -> response body cache with a TTL, safe to share across threads"""
+    
+    def __init__(self, path: str, ttl: int):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._create_table()
+        except sqlite3.Error as e:
+            logger.warning(f"PubChem cache unavailable at {path} ({e}); using in-memory cache")
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+            self._create_table()
+    
+    def _create_table(self):
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, body BLOB NOT NULL, expires REAL NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    def get(self, url: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT body, expires FROM responses WHERE url = ?", (url,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+    
+    def set(self, url: str, body: bytes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, expires) VALUES (?, ?, ?)",
+                (url, body, time.time() + self.ttl),
+            )
+            self._conn.commit()
+
+# Safety-data buckets, in precedence order for labels matching several keywords
+_HAZARD, _PRECAUTION, _NOTE, _PHYSICAL = range(4)
+
+# Physical-property label keyword -> output key, earlier entries win
+_PHYS_MAPPING_TUPLES = (
+    ('molecular weight', 'molecular_weight'),
+    ('boiling point', 'boiling_point'),
+    ('melting point', 'melting_point'),
+    ('density', 'density'),
+    ('solubility', 'solubility'),
+    ('flash point', 'flash_point'),
+)
+
+# Prop-label keyword -> (bucket, tie-break order, physical-property key)
+_LABEL_KEYWORDS = {
+    'hazard': (_HAZARD, 0, None),
+    'danger': (_HAZARD, 0, None),
+    'precaution': (_PRECAUTION, 0, None),
+    **{keyword: (_NOTE, 0, None) for keyword in ('safety', 'handling', 'storage', 'risk')},
+    **{keyword: (_PHYSICAL, order, key) for order, (keyword, key) in enumerate(_PHYS_MAPPING_TUPLES)},
+}
+# One alternation finds every keyword in a label in a single scan
+_LABEL_KEYWORD_RE = re.compile('|'.join(map(re.escape, _LABEL_KEYWORDS)))
+
+# Normalized prop label -> extract_compound_info field, for O(1) dispatch on known labels
+_LABEL_TO_KEY = {
+    'iupac name': 'name',
+    'preferred name': 'name',
+    'chemical name': 'name',
+    'canonical smiles': 'canonical_smiles',
+    'molecular formula': 'molecular_formula',
+    'molecular weight': 'molecular_weight',
+    'cas registry number': 'cas_number',
+}
+# Substring fallback for labels not in _LABEL_TO_KEY, checked in order
+_LABEL_SUBSTRINGS = (
+    (('iupac name', 'preferred name', 'chemical name'), 'name'),
+    (('canonical smiles',), 'canonical_smiles'),
+    (('molecular formula',), 'molecular_formula'),
+    (('molecular weight',), 'molecular_weight'),
+    (('cas', 'registry number'), 'cas_number'),
+)
+
+@lru_cache(maxsize=1024)
+def _label_to_key(label: str) -> Optional[str]:
+    """extract_compound_info field for a lower-cased prop label, or None"""
+    key = _LABEL_TO_KEY.get(label)
+    if key is None:
+        key = next((key for keywords, key in _LABEL_SUBSTRINGS if any(k in label for k in keywords)), None)
+    return key
+
+# Hazard-text keyword -> GHS pictogram code
+_GHS_MAP = {
+    'flammable': 'GHS02',
+    'oxidizing': 'GHS03',
+    'corrosive': 'GHS05',
+    'toxic': 'GHS06',
+    'health hazard': 'GHS08',
+    'environmental hazard': 'GHS09',
+}
+_GHS_RE = re.compile('|'.join(map(re.escape, _GHS_MAP)))
+
+# H/P statement codes as they appear in PubChem GHS records, e.g. "H225" or "P301+P310"
+_H_CODE_RE = re.compile(r'^(H\d{3}(?:\+H\d{3})*)')
+_P_CODE_RE = re.compile(r'P\d{3}(?:\+P\d{3})*')
+
+# Well-known compounds, recognised by canonical SMILES so any spelling matches (OCC == CCO)
+_KNOWN_COMPOUNDS = (
+    ('CCO', 'Ethanol'),
+    ('CC(=O)O', 'Acetic Acid'),
+    ('CC(=O)Oc1ccccc1C(=O)O', 'Aspirin'),
+    ('CN1C=NC2=C1C(=O)N(C(=O)N2C)C', 'Caffeine'),
+    ('c1ccccc1', 'Benzene'),
+    ('C1CCCCC1', 'Cyclohexane'),
+    ('O=C=O', 'Carbon Dioxide'),
+    ('C#N', 'Hydrogen Cyanide'),
+    ('CCCCCC', 'Hexane'),
+    ('CCOC(=O)C', 'Ethyl Acetate'),
+    ('CC(N)C', 'Isopropylamine'),
+)
+
+@lru_cache(maxsize=None)
+def _canonical_name_map() -> Dict[str, str]:
+    """Canonical SMILES -> name for _KNOWN_COMPOUNDS, built on first use"""
+    return {canonicalize_smiles(smiles) or smiles: name for smiles, name in _KNOWN_COMPOUNDS}
+
+# Functional-group hints: every fragment must be present; first match wins
+_GROUP_HINTS = (
+    (('C(=O)O', 'c1ccccc1'), 'Benzoic Acid Derivative'),
+    (('C(=O)O',), 'Carboxylic Acid'),
+    (('C(=O)N',), 'Amide'),
+    (('N', 'C=O'), 'Amide Compound'),
+    (('Oc1ccccc1',), 'Phenol Derivative'),
+    (('c1ccccc1',), 'Aromatic Compound'),
+    (('C#C',), 'Alkyne'),
+    (('C=C',), 'Alkene'),
+)
+
 class PubChemService:
     def __init__(self):
         self.base_url = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
+        self.view_url = "https://pubchem.ncbi.nlm.nih.gov/rest/pug_view"
         self.timeout = 15
         self.retry_delay = 1
+        # Seconds before a slow PubChem SMILES lookup is hedged with the alternate endpoint
+        self.hedge_delay = 0.3
+        # Which endpoint answered hedged lookups ('smiles' or 'fastidentity') - for tuning hedge_delay
+        self.hedge_stats = Counter()
         
         # Additional data sources for fallback
         self.cir_endpoint = "https://cactus.nci.nih.gov/chemical/structure"
         self.chemspider_key = None  # You can add ChemSpider API key if available
+        
+        # Pooled keep-alive session; transient PubChem/CIR errors are retried with backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=self.retry_delay, status_forcelist=[429, 500, 502, 503, 504]),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        self.cache = _ResponseCache(PUBCHEM_CACHE_PATH, PUBCHEM_CACHE_TTL)
+        # Successful PubChem/CIR lookups keyed by canonical SMILES, in front of the disk cache
+        self._smiles_cache: Dict[str, Dict[str, Any]] = {}
+        # Lookups run on _io_pool and batch threads; FIFO eviction must not race insertion
+        self._smiles_cache_lock = threading.Lock()
+        # Lookups currently running, keyed like _smiles_cache, so duplicates can join them
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Every outbound request goes through one of these, so concurrent lookups can't
+        # outrun PubChem's rate limit and set off 429 retry storms
+        self._pubchem_limiter = _RateLimiter(PUBCHEM_MAX_CONCURRENCY, PUBCHEM_MAX_RPS)
+        self._cir_limiter = _RateLimiter(CIR_MAX_CONCURRENCY)
+        # Runs independent lookups side by side (CIR fields, hedged PubChem requests)
+        self._io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pubchem-io")
+        atexit.register(self.close)
+    
+    def close(self):
+        """Release pooled connections, worker threads and the response cache"""
+        self._io_pool.shutdown(wait=False)
+        self.session.close()
+        self.cache.close()
+    
+    def _get_json(self, url: str) -> Optional[Dict[str, Any]]:
+        """GET a PubChem JSON document, served from the response cache while fresh"""
+        body = self.cache.get(url)
+        if body is None:
+            with self._pubchem_limiter:
+                response = self.session.get(url, timeout=self.timeout)
+            if response.status_code != 200:
+                return None
+            # Raw bytes: no UTF-8 decode step, and orjson parses bytes directly
+            body = response.content
+            self.cache.set(url, body)
+        return orjson.loads(body)
     
     def get_compound_by_smiles(self, smiles: str) -> Optional[Dict[str, Any]]:
-        """Get compound data by SMILES from PubChem with multiple fallbacks"""
+        """
+        Get compound data by SMILES from PubChem with multiple fallbacks.
+        Results are cached and shared between callers - treat them as read-only.
+        """
         try:
             # Clean SMILES first
             clean_smiles = self._clean_smiles(smiles)
@@ -26,14 +272,38 @@ class PubChemService:
                 logger.warning("Empty or invalid SMILES provided")
                 return None
             
-            # Try PubChem first
-            compound_data = self._get_compound_by_smiles_pubchem(clean_smiles)
+            # Equivalent SMILES spellings share one cache entry
+            canonical = canonicalize_smiles(clean_smiles)
+            if canonical is None:
+                # RDKit rejected it - no database will know it, so skip the network round trips
+                logger.info(f"Unparsable SMILES, generating basic data: {clean_smiles}")
+                return self._generate_basic_compound_data(clean_smiles)
+            cache_key = canonical
+            with self._smiles_cache_lock:
+                compound_data = self._smiles_cache.get(cache_key)
             if compound_data:
                 return compound_data
             
-            # If PubChem fails, try CIR (Cactus) service
-            logger.info(f"PubChem failed, trying CIR for SMILES: {clean_smiles}")
-            compound_data = self._get_compound_by_smiles_cir(clean_smiles)
+            # Single flight: concurrent callers for the same structure wait on one lookup
+            with self._inflight_lock:
+                lookup = self._inflight.get(cache_key)
+                leader = lookup is None
+                if leader:
+                    lookup = self._inflight[cache_key] = Future()
+            
+            if leader:
+                try:
+                    compound_data = self._lookup_smiles_remote(clean_smiles, cache_key)
+                    lookup.set_result(compound_data)
+                except BaseException as e:
+                    lookup.set_exception(e)
+                    raise
+                finally:
+                    with self._inflight_lock:
+                        self._inflight.pop(cache_key, None)
+            else:
+                compound_data = lookup.result()
+            
             if compound_data:
                 return compound_data
                 
@@ -45,6 +315,64 @@ class PubChemService:
             logger.error(f"All SMILES lookup methods failed: {e}")
             return self._generate_basic_compound_data(self._clean_smiles(smiles))
 
+    def _lookup_smiles_remote(self, clean_smiles: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        """PubChem, then CIR; a hit is stored in the SMILES cache under cache_key"""
+        # Try PubChem first
+        compound_data = self._get_compound_by_smiles_pubchem(clean_smiles)
+        
+        # If PubChem fails, try CIR (Cactus) service
+        if not compound_data:
+            logger.info(f"PubChem failed, trying CIR for SMILES: {clean_smiles}")
+            compound_data = self._get_compound_by_smiles_cir(clean_smiles)
+        
+        if compound_data:
+            # Only real lookups are cached, so outages don't pin generated placeholders
+            with self._smiles_cache_lock:
+                if len(self._smiles_cache) >= SMILES_CACHE_SIZE:
+                    self._smiles_cache.pop(next(iter(self._smiles_cache)))
+                self._smiles_cache[cache_key] = compound_data
+        return compound_data
+    
+    def get_compounds_by_smiles_batch(self, smiles_list: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve many SMILES at once. PUG REST takes one SMILES per CID lookup, so those run
+        concurrently; properties for all resolved CIDs then come back from a single POST.
+        Returns {cleaned SMILES: PropertyTable row}; unresolved SMILES are left out.
+        """
+        unique_smiles = list(dict.fromkeys(filter(None, map(self._clean_smiles, smiles_list))))
+        cids = dict(zip(unique_smiles, self._io_pool.map(self._resolve_cid, unique_smiles)))
+        found = {smiles: cid for smiles, cid in cids.items() if cid}
+        if not found:
+            return {}
+        
+        url = f"{self.base_url}/compound/cid/property/{COMPOUND_PROPERTIES}/JSON"
+        try:
+            with self._pubchem_limiter:
+                response = self.session.post(
+                    url, data={"cid": ",".join(map(str, sorted(set(found.values()))))}, timeout=self.timeout
+                )
+            if response.status_code != 200:
+                logger.warning(f"PubChem batch property lookup returned {response.status_code}")
+                return {}
+            rows = orjson.loads(response.content).get('PropertyTable', {}).get('Properties', [])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning(f"PubChem batch property lookup failed: {e}")
+            return {}
+        
+        by_cid = {row.get('CID'): row for row in rows}
+        return {smiles: by_cid[cid] for smiles, cid in found.items() if cid in by_cid}
+    
+    def _resolve_cid(self, smiles: str) -> Optional[int]:
+        """First PubChem CID for a SMILES, or None (PubChem reports unknown structures as CID 0)"""
+        try:
+            data = self._get_json(f"{self.base_url}/compound/smiles/{quote(smiles)}/cids/JSON")
+        except Exception as e:
+            logger.warning(f"PubChem CID resolution failed for {smiles}: {e}")
+            return None
+        
+        cids = (data or {}).get('IdentifierList', {}).get('CID') or [0]
+        return cids[0] or None
+    
     def get_chemical_properties_with_fallback(self, smiles: str) -> Dict[str, any]:
         """
         Enhanced chemical properties lookup with CAS fallback
@@ -54,91 +382,91 @@ class PubChemService:
         # If CAS is missing, try enhanced CAS lookup
         if not base_properties.get('cas_number'):
             cas_result = cas_service.get_cas_from_smiles(smiles)
-            if cas_result.get('cas_number'):
-                base_properties['cas_number'] = cas_result['cas_number']
-                base_properties['cas_source'] = cas_result['source']
-                base_properties['cas_confidence'] = cas_result.get('confidence', 'medium')
+            if cas_result.cas_number:
+                base_properties['cas_number'] = cas_result.cas_number
+                base_properties['cas_source'] = cas_result.source
+                base_properties['cas_confidence'] = cas_result.confidence
         
         return base_properties
 
     def _get_compound_by_smiles_pubchem(self, smiles: str) -> Optional[Dict[str, Any]]:
-        """Try PubChem SMILES lookup"""
+        """
+        Try PubChem SMILES lookup. If the compound/smiles request is still running after
+        hedge_delay, compound/fastidentity/smiles is raced against it and the first answer wins.
+        """
+        smiles_lookup = self._io_pool.submit(self._pubchem_smiles_properties, smiles)
+        done, _ = wait([smiles_lookup], timeout=self.hedge_delay)
+        if done:
+            # Fast path: no hedge; fall back to fastidentity as before
+            return smiles_lookup.result() or self._pubchem_fastidentity_properties(smiles)
+        
+        logger.info(f"PubChem compound/smiles slower than {self.hedge_delay}s, hedging with fastidentity: {smiles}")
+        fastidentity_lookup = self._io_pool.submit(self._pubchem_fastidentity_properties, smiles)
+        pending = {smiles_lookup, fastidentity_lookup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result:
+                    # A request already in flight can't be aborted; this only drops queued work
+                    for other in pending:
+                        other.cancel()
+                    self.hedge_stats['fastidentity' if future is fastidentity_lookup else 'smiles'] += 1
+                    return result
+        
+        self.hedge_stats['miss'] += 1
+        return None
+    
+    def _pubchem_smiles_properties(self, smiles: str) -> Optional[Dict[str, Any]]:
+        """PubChem property lookup through the compound/smiles endpoint - one round trip, <1 KB"""
+        logger.info(f"PubChem compound/smiles call: {smiles}")
+        return self._get_smiles_properties(f"{self.base_url}/compound/smiles/{quote(smiles)}")
+    
+    def _pubchem_fastidentity_properties(self, smiles: str) -> Optional[Dict[str, Any]]:
+        """PubChem property lookup through the compound/fastidentity/smiles endpoint"""
+        logger.info(f"PubChem compound/fastidentity/smiles call: {smiles}")
+        return self._get_smiles_properties(f"{self.base_url}/compound/fastidentity/smiles/{quote(smiles)}")
+    
+    def _get_smiles_properties(self, compound_url: str) -> Optional[Dict[str, Any]]:
+        """PropertyTable response for a compound URL, or None if PubChem doesn't know the structure"""
         try:
-            # Use the compound/fastidentity/smiles endpoint
-            url = f"{self.base_url}/compound/fastidentity/smiles/{quote(smiles)}/JSON"
-            
-            logger.info(f"PubChem SMILES API call: {smiles}")
-            response = requests.get(url, timeout=self.timeout)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('IdentifierList', {}).get('CID'):
-                    cid = data['IdentifierList']['CID'][0]
-                    return self.get_compound_by_cid(cid)
-            
-            # Fallback to direct compound/smiles endpoint
-            url = f"{self.base_url}/compound/smiles/{quote(smiles)}/JSON"
-            response = requests.get(url, timeout=self.timeout)
-            
-            if response.status_code == 200:
-                return response.json()
-                
+            data = self._get_json(f"{compound_url}/property/{COMPOUND_PROPERTIES}/JSON")
         except Exception as e:
             logger.warning(f"PubChem SMILES lookup failed: {e}")
-            
+            return None
+        
+        # Unknown structures come back as a CID 0 row
+        if data and self._property_row(data).get('CID'):
+            return data
         return None
     
     def _get_compound_by_smiles_cir(self, smiles: str) -> Optional[Dict[str, Any]]:
         """Try CIR (Cactus) service for compound data"""
         try:
-            # Get IUPAC name from CIR
-            name_url = f"{self.cir_endpoint}/{quote(smiles)}/iupac_name"
-            response = requests.get(name_url, timeout=self.timeout)
+            # The four CIR lookups are independent - issue them concurrently
+            paths = ("iupac_name", "cas", "formula", "mw")
+            name, cas_text, formula, weight_text = self._io_pool.map(
+                lambda path: self._get_cir_text(smiles, path), paths
+            )
             
-            name = None
-            if response.status_code == 200:
-                name = response.text.strip()
-                if name and "NotFound" not in name:
-                    logger.info(f"CIR returned name: {name}")
-                else:
-                    name = None
-            
-            # Get CAS from CIR
-            cas_url = f"{self.cir_endpoint}/{quote(smiles)}/cas"
-            response = requests.get(cas_url, timeout=self.timeout)
+            if name:
+                logger.info(f"CIR returned name: {name}")
             
             cas_number = None
-            if response.status_code == 200:
-                cas_text = response.text.strip()
-                if cas_text and "NotFound" not in cas_text:
-                    # CIR might return multiple CAS numbers, take the first one
-                    cas_numbers = cas_text.split('\n')
-                    cas_number = cas_numbers[0] if cas_numbers else None
-                    logger.info(f"CIR returned CAS: {cas_number}")
-            
-            # Get formula from CIR
-            formula_url = f"{self.cir_endpoint}/{quote(smiles)}/formula"
-            response = requests.get(formula_url, timeout=self.timeout)
-            
-            formula = None
-            if response.status_code == 200:
-                formula = response.text.strip()
-                if formula and "NotFound" not in formula:
-                    logger.info(f"CIR returned formula: {formula}")
-                else:
-                    formula = None
+            if cas_text:
+                # CIR might return multiple CAS numbers, take the first one
+                cas_numbers = cas_text.split('\n')
+                cas_number = cas_numbers[0] if cas_numbers else None
+                logger.info(f"CIR returned CAS: {cas_number}")
             
-            # Get molecular weight from CIR
-            weight_url = f"{self.cir_endpoint}/{quote(smiles)}/mw"
-            response = requests.get(weight_url, timeout=self.timeout)
+            if formula:
+                logger.info(f"CIR returned formula: {formula}")
             
             molecular_weight = None
-            if response.status_code == 200:
+            if weight_text:
                 try:
-                    weight_text = response.text.strip()
-                    if weight_text and "NotFound" not in weight_text:
-                        molecular_weight = float(weight_text)
-                        logger.info(f"CIR returned molecular weight: {molecular_weight}")
+                    molecular_weight = float(weight_text)
+                    logger.info(f"CIR returned molecular weight: {molecular_weight}")
                 except ValueError:
                     molecular_weight = None
             
@@ -182,6 +510,29 @@ class PubChemService:
             
         return None
     
+    def _get_cir_text(self, smiles: str, path: str) -> Optional[str]:
+        """Fetch one CIR representation; None when missing or on error. Hits go to the disk cache."""
+        url = f"{self.cir_endpoint}/{quote(smiles)}/{path}"
+        cached = self.cache.get(url)
+        if cached is not None:
+            return cached.decode() if isinstance(cached, bytes) else cached
+        
+        try:
+            with self._cir_limiter:
+                response = self.session.get(url, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"CIR {path} lookup failed: {e}")
+            return None
+        
+        if response.status_code != 200:
+            return None
+        # Check the raw bytes so misses (NotFound text or an HTML error page) are never decoded
+        raw = response.content.strip()
+        if not raw or raw[:1] == b"<" or b"NotFound" in raw:
+            return None
+        self.cache.set(url, raw)
+        return raw.decode('utf-8', 'ignore')
+    
     def _generate_basic_compound_data(self, smiles: str) -> Dict[str, Any]:
         """Generate basic compound data when all external services fail"""
         # Try to extract a name from common patterns
@@ -215,50 +566,26 @@ class PubChemService:
     
     def _guess_compound_name(self, smiles: str) -> Optional[str]:
         """Guess compound name based on SMILES patterns"""
-        patterns = {
-            r'CCO$': 'Ethanol',
-            r'CC(=O)O$': 'Acetic Acid',
-            r'CC(=O)Oc1ccccc1C(=O)O$': 'Aspirin',
-            r'CN1C=NC2=C1C(=O)N(C(=O)N2C)C$': 'Caffeine',
-            r'c1ccccc1$': 'Benzene',
-            r'C1CCCCC1$': 'Cyclohexane',
-            r'O=C=O$': 'Carbon Dioxide',
-            r'C#N$': 'Hydrogen Cyanide',
-            r'CCCCCC$': 'Hexane',
-            r'CCOC(=O)C$': 'Ethyl Acetate',
-            r'CC(N)C$': 'Isopropylamine',
-        }
-        
-        for pattern, name in patterns.items():
-            if re.search(pattern, smiles):
-                return name
+        name = _canonical_name_map().get(canonicalize_smiles(smiles) or smiles)
+        if name:
+            return name
         
         # Check for common functional groups
-        if 'C(=O)O' in smiles and 'c1ccccc1' in smiles:
-            return 'Benzoic Acid Derivative'
-        elif 'C(=O)O' in smiles:
-            return 'Carboxylic Acid'
-        elif 'C(=O)N' in smiles:
-            return 'Amide'
-        elif 'N' in smiles and 'C=O' in smiles:
-            return 'Amide Compound'
-        elif 'Oc1ccccc1' in smiles:
-            return 'Phenol Derivative'
-        elif 'c1ccccc1' in smiles:
-            return 'Aromatic Compound'
-        elif 'C#C' in smiles:
-            return 'Alkyne'
-        elif 'C=C' in smiles:
-            return 'Alkene'
+        for fragments, name in _GROUP_HINTS:
+            if all(fragment in smiles for fragment in fragments):
+                return name
         
         return None
     
     def _generate_systematic_name(self, smiles: str) -> str:
         """Generate a systematic name based on SMILES analysis"""
+        # One pass yields every single-character feature used below
+        counts = Counter(smiles)
+        
         # Count carbon atoms for alkane naming
-        carbon_count = smiles.count('C') - smiles.count('Cl') - smiles.count('Cc')
+        carbon_count = counts['C'] - smiles.count('Cl') - smiles.count('Cc')
         
-        if carbon_count <= 8 and 'c' not in smiles and '=' not in smiles and '#' not in smiles:
+        if carbon_count <= 8 and not (counts['c'] or counts['='] or counts['#']):
             # Simple alkane naming
             alkane_names = {
                 1: 'Methane', 2: 'Ethane', 3: 'Propane', 4: 'Butane',
@@ -274,15 +601,38 @@ class PubChemService:
             return 'Amide'
         elif 'Oc1ccccc1' in smiles and smiles.count('C(=O)') == 1:
             return 'Ester'
-        elif 'N' in smiles and smiles.count('C') > 2:
+        elif counts['N'] and counts['C'] > 2:
             return 'Amine Compound'
-        elif 'O' in smiles and 'C' in smiles:
+        elif counts['O'] and counts['C']:
             return 'Oxygen-containing Compound'
         
         return 'Organic Compound'
     
-    def extract_compound_info(self, compound_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract standardized compound information from PubChem data - ENHANCED"""
+    @staticmethod
+    def _preprocess_props(compound: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Flatten a compound's props to (lower-cased label, value) pairs, once per compound"""
+        return [
+            (prop.get('urn', {}).get('label', '').lower(), prop.get('value', {}))
+            for prop in compound.get('props', [])
+        ]
+    
+    @staticmethod
+    def _property_row(compound_data: Dict[str, Any]) -> Dict[str, Any]:
+        """First row of a PUG REST PropertyTable response"""
+        rows = compound_data.get('PropertyTable', {}).get('Properties') or [{}]
+        return rows[0]
+    
+    def extract_compound_info(
+        self, compound_data: Dict[str, Any], props: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract standardized compound information from PubChem data - ENHANCED.
+        Accepts both full records (PC_Compounds) and property lookups (PropertyTable).
+        ``props`` takes the output of _preprocess_props when the caller already has it.
+        """
+        if compound_data and 'PropertyTable' in compound_data:
+            return self._extract_property_row(self._property_row(compound_data))
+        
         if not compound_data or 'PC_Compounds' not in compound_data:
             return {}
         
@@ -299,26 +649,19 @@ class PubChemService:
                 'source': 'pubchem'  # Track data source
             }
             
-            props = compound.get('props', [])
+            if props is None:
+                props = self._preprocess_props(compound)
             
-            for prop in props:
-                urn = prop.get('urn', {})
-                label = urn.get('label', '').lower()
-                value = prop.get('value', {})
+            for label, value in props:
+                key = _label_to_key(label)
+                if key is None:
+                    continue
                 
-                if any(name_keyword in label for name_keyword in ['iupac name', 'preferred name', 'chemical name']):
-                    if value.get('sval'):
-                        info['name'] = value['sval']
-                elif 'canonical smiles' in label and value.get('sval'):
-                    info['canonical_smiles'] = value['sval']
-                    info['smiles'] = value['sval']
-                elif 'molecular formula' in label and value.get('sval'):
-                    info['molecular_formula'] = value['sval']
-                elif 'molecular weight' in label and value.get('fval'):
-                    info['molecular_weight'] = value['fval']
-                elif any(cas_keyword in label for cas_keyword in ['cas', 'registry number']):
-                    if value.get('sval'):
-                        info['cas_number'] = value['sval']
+                found = value.get('fval') if key == 'molecular_weight' else value.get('sval')
+                if found:
+                    info[key] = found
+                    if key == 'canonical_smiles':
+                        info['smiles'] = found
             
             # If we got data from CIR or generated data, update source
             if info['cid'] == 0:
@@ -333,6 +676,27 @@ class PubChemService:
             logger.error(f"Error extracting compound info: {e}")
             return {}
     
+    def _extract_property_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Standardized compound information from one PropertyTable row"""
+        weight = row.get('MolecularWeight')
+        try:
+            # PubChem sends the weight as a string in property tables
+            weight = float(weight) if weight is not None else None
+        except (TypeError, ValueError):
+            weight = None
+        
+        smiles = row.get('CanonicalSMILES') or row.get('SMILES')
+        info = {
+            'cid': row.get('CID'),
+            'name': row.get('IUPACName'),
+            'smiles': smiles,
+            'canonical_smiles': smiles,
+            'molecular_formula': row.get('MolecularFormula'),
+            'molecular_weight': weight,
+            'source': 'pubchem',
+        }
+        return {k: v for k, v in info.items() if v is not None}
+    
     def get_compound_safety_data(self, identifier: str, identifier_type: str = 'name') -> Optional[Dict[str, Any]]:
         """Get comprehensive safety data for a compound with enhanced fallbacks"""
         compound_data = None
@@ -344,53 +708,236 @@ class PubChemService:
         elif identifier_type == 'cas':
             compound_data = self.get_compound_by_cas(identifier)
         
-        if compound_data:
-            safety_data = self.extract_safety_data(compound_data)
-            compound_info = self.extract_compound_info(compound_data)
+        if compound_data and (compound_data.get('PC_Compounds') or 'PropertyTable' in compound_data):
+            # Both extractors walk the same props; lower-case the labels only once.
+            # Property lookups carry no props - their hazards come from the GHS section below
+            props = self._preprocess_props(compound_data['PC_Compounds'][0]) if 'PC_Compounds' in compound_data else []
+            safety_data = self.extract_safety_data(compound_data, props)
+            compound_info = self.extract_compound_info(compound_data, props)
+            
+            # Compound records rarely carry hazard text; pull just the GHS section instead
+            cid = safety_data.get('pubchem_cid')
+            if cid and not safety_data.get('hazard_statements'):
+                ghs = self.get_compound_ghs(cid)
+                if ghs:
+                    safety_data['hazard_statements'] = ghs['hazard_statements']
+                    safety_data['precautionary_statements'] = {
+                        **safety_data.get('precautionary_statements', {}), **ghs['precautionary_statements']
+                    }
+                    safety_data['ghs_classification'] = {
+                        'pictograms': ghs['pictograms'], 'signal_word': ghs['signal_word']
+                    }
+            
             return {**compound_info, **safety_data}
         
         return None
+    
+    def get_compound_ghs(self, cid: int) -> Dict[str, Any]:
+        """
+        Fetch only the GHS Classification section for a CID from PUG View -
+        kilobytes instead of the full compound record
+        """
+        try:
+            url = f"{self.view_url}/data/compound/{int(cid)}/JSON?heading=GHS+Classification"
+            data = self._get_json(url)
+        except Exception as e:
+            logger.warning(f"PubChem GHS lookup failed: {e}")
+            return {}
+        
+        if not data:
+            return {}
+        
+        hazards, precautions, pictograms, signal_word = {}, {}, [], None
+        sections = list(data.get('Record', {}).get('Section', []))
+        while sections:
+            section = sections.pop()
+            sections.extend(section.get('Section', []))
+            
+            for info in section.get('Information', []):
+                name = info.get('Name', '').lower()
+                for item in info.get('Value', {}).get('StringWithMarkup', []):
+                    text = item.get('String', '')
+                    if 'pictogram' in name:
+                        for markup in item.get('Markup', []):
+                            # Pictogram URLs end in the GHS code, e.g. .../GHS02.svg
+                            code = markup.get('URL', '').rsplit('/', 1)[-1].split('.', 1)[0]
+                            if code.startswith('GHS') and code not in pictograms:
+                                pictograms.append(code)
+                    elif name == 'signal' and text:
+                        if text == 'Danger' or signal_word is None:
+                            signal_word = text
+                    elif 'hazard statement' in name:
+                        match = _H_CODE_RE.match(text)
+                        if match:
+                            hazards.setdefault(match.group(1), text)
+                    elif 'precautionary statement' in name:
+                        for code in _P_CODE_RE.findall(text):
+                            precautions.setdefault(code, code)
+        
+        if not (hazards or precautions or pictograms):
+            return {}
+        
+        return {
+            'hazard_statements': hazards,
+            'precautionary_statements': precautions,
+            'pictograms': pictograms,
+            'signal_word': signal_word,
+        }
+    
+    # Async facades for FastAPI handlers: the blocking lookup runs in a worker thread over
+    # the pooled session, so the event loop stays free while PubChem/CIR answer.
+    
+    async def aget_compound_by_smiles(self, smiles: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_compound_by_smiles"""
+        return await asyncio.to_thread(self.get_compound_by_smiles, smiles)
+    
+    async def aget_compound_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_compound_by_name"""
+        return await asyncio.to_thread(self.get_compound_by_name, name)
+    
+    async def aget_compound_by_cas(self, cas_number: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_compound_by_cas"""
+        return await asyncio.to_thread(self.get_compound_by_cas, cas_number)
+    
+    async def aget_compound_safety_data(self, identifier: str, identifier_type: str = 'name') -> Optional[Dict[str, Any]]:
+        """Async variant of get_compound_safety_data"""
+        return await asyncio.to_thread(self.get_compound_safety_data, identifier, identifier_type)
+    
+    async def get_compound_safety_data_batch(
+        self, identifiers: List[str], identifier_type: str = 'name', max_concurrency: int = 10
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch safety data for many compounds concurrently, preserving input order.
+        Lookups run in worker threads over the pooled session; the semaphore keeps
+        us within PubChem's request-rate limits. Failed lookups come back as None.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch(identifier: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.aget_compound_safety_data(identifier, identifier_type)
+        
+        results = await asyncio.gather(*(fetch(i) for i in identifiers), return_exceptions=True)
+        for identifier, result in zip(identifiers, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Safety data lookup failed for {identifier}: {result}")
+        return [None if isinstance(r, Exception) else r for r in results]
 
-    # Keep all your existing methods below (unchanged)
     def get_compound_by_name(self, name: str) -> Optional[Dict[str, Any]]:
-        # ... (existing implementation)
-        pass
+        """Get compound data by name from PubChem"""
+        if not name or not name.strip():
+            return None
+        
+        try:
+            url = f"{self.base_url}/compound/name/{quote(name.strip())}/JSON"
+            logger.info(f"PubChem name API call: {name}")
+            return self._get_json(url)
+        except Exception as e:
+            logger.warning(f"PubChem name lookup failed: {e}")
+        
+        return None
     
     def get_compound_by_cas(self, cas_number: str) -> Optional[Dict[str, Any]]:
-        # ... (existing implementation) 
-        pass
+        """Get compound data by CAS number (PubChem resolves CAS numbers as synonyms)"""
+        if not cas_number or not cas_number.strip():
+            return None
+        
+        try:
+            url = f"{self.base_url}/compound/name/{quote(cas_number.strip())}/JSON"
+            logger.info(f"PubChem CAS API call: {cas_number}")
+            return self._get_json(url)
+        except Exception as e:
+            logger.warning(f"PubChem CAS lookup failed: {e}")
+        
+        return None
     
     def get_compound_by_cid(self, cid: int) -> Optional[Dict[str, Any]]:
-        # ... (existing implementation)
-        pass
+        """Get compound data by PubChem CID"""
+        try:
+            url = f"{self.base_url}/compound/cid/{int(cid)}/JSON"
+            return self._get_json(url)
+        except Exception as e:
+            logger.warning(f"PubChem CID lookup failed: {e}")
+        
+        return None
     
     def _clean_smiles(self, smiles: str) -> str:
-        # ... (existing implementation)
-        pass
+        """Strip surrounding whitespace from a SMILES string"""
+        if not smiles:
+            return ""
+        return smiles.strip()
     
-    def extract_safety_data(self, compound_data: Dict[str, Any]) -> Dict[str, Any]:
-        # ... (existing implementation)
-        pass
-    
-    def _extract_hazard_statements(self, compound: Dict[str, Any]) -> Dict[str, Any]:
-        # ... (existing implementation)
-        pass
-    
-    def _extract_precautionary_statements(self, compound: Dict[str, Any]) -> Dict[str, Any]:
-        # ... (existing implementation)
-        pass
-    
-    def _extract_safety_notes(self, compound: Dict[str, Any]) -> str:
-        # ... (existing implementation)
-        pass
-    
-    def _extract_physical_properties(self, compound: Dict[str, Any]) -> Dict[str, Any]:
-        # ... (existing implementation)
-        pass
+    def extract_safety_data(
+        self, compound_data: Dict[str, Any], props: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract hazard, precautionary, handling and physical-property data
+        in a single pass over the compound props.
+        ``props`` takes the output of _preprocess_props when the caller already has it.
+        """
+        if compound_data and 'PropertyTable' in compound_data:
+            # Property lookups carry no props; keep the CID so callers can fetch the GHS section
+            compound = {'id': {'id': {'cid': self._property_row(compound_data).get('CID')}}}
+            props = []
+        elif not compound_data or 'PC_Compounds' not in compound_data:
+            return {}
+        else:
+            compound = compound_data['PC_Compounds'][0]
+        
+        try:
+            hazards, precautions, notes, physical = {}, {}, [], {}
+            if props is None:
+                props = self._preprocess_props(compound)
+            
+            for label, value in props:
+                matches = _LABEL_KEYWORD_RE.findall(label)
+                if not matches:
+                    continue
+                
+                sval = value.get('sval') or (str(value['fval']) if 'fval' in value else None)
+                if not sval:
+                    continue
+                
+                bucket, _, key = min(_LABEL_KEYWORDS[match] for match in matches)
+                if bucket == _HAZARD:
+                    hazards[label] = sval
+                elif bucket == _PRECAUTION:
+                    precautions[label] = sval
+                elif bucket == _NOTE:
+                    notes.append(sval)
+                else:
+                    physical[key] = sval
+            
+            return {
+                'pubchem_cid': compound.get('id', {}).get('id', {}).get('cid'),
+                'hazard_statements': hazards,
+                'precautionary_statements': precautions,
+                'safety_notes': ' '.join(notes) if notes else 'No specific safety notes available.',
+                'physical_properties': physical,
+                'ghs_classification': self._extract_ghs_classification(hazards),
+            }
+            
+        except Exception as e:
+            logger.error(f"Error extracting safety data: {e}")
+            return {}
     
-    def _extract_ghs_classification(self, compound: Dict[str, Any]) -> Dict[str, Any]:
-        # ... (existing implementation)
-        pass
+    def _extract_ghs_classification(self, hazards: Dict[str, str]) -> Dict[str, Any]:
+        """Derive GHS pictogram codes and signal word from extracted hazard statements"""
+        pictograms = []
+        signal_word = None
+        for hazard_text in hazards.values():
+            hazard_lower = hazard_text.lower()
+            for match in _GHS_RE.findall(hazard_lower):
+                if _GHS_MAP[match] not in pictograms:
+                    pictograms.append(_GHS_MAP[match])
+            if 'danger' in hazard_lower:
+                signal_word = 'Danger'
+            elif 'warning' in hazard_lower and signal_word is None:
+                signal_word = 'Warning'
+        
+        return {'pictograms': pictograms, 'signal_word': signal_word}
 
-# Global service instance
-pubchem_service = PubChemService()
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_pubchem_service() -> PubChemService:
+    """Shared service instance, created on first use"""
+    return PubChemService()
\ No newline at end of file
@@ -1,55 +1,65 @@
 """
 Utility Functions Package
 Contains helper functions and utilities for the application
-"""
-from .chemical_utils import (
-    canonicalize_smiles,
-    generate_inchikey,
-    calculate_molecular_properties,
-    validate_chemical_structure,
-    generate_unique_id,
-    generate_barcode,
-    process_chemical_data,
-    generate_chemical_qr_data,
-    generate_location_string,
-    validate_storage_condition,
-    calculate_stock_status,
-    calculate_properties_in_background,
-    estimate_cas_from_smiles,
-    validate_and_suggest_name,
-    generate_compound_summary,
-    get_calculation_progress
-)
 
-from .notifications import (
-    NotificationService,
-    notification_service,
-    check_and_notify_low_stock,
-    send_daily_stock_report
-)
+Submodules are imported on first attribute access (PEP 562), so importing
+one of them - e.g. app.utils.barcode_utils - doesn't pull in the others.
+"""
+from importlib import import_module
 
-__all__ = [
-    # Chemical utilities
+_CHEMICAL_NAMES = (
     "canonicalize_smiles",
-    "generate_inchikey", 
+    "generate_inchikey",
     "calculate_molecular_properties",
     "validate_chemical_structure",
     "generate_unique_id",
+    "generate_unique_ids",
     "generate_barcode",
+    "ChemicalRecord",
+    "process_chemical_record",
     "process_chemical_data",
+    "process_chemical_data_batch",
+    "process_chemicals_batch",
+    "process_chemicals_to_arrays",
     "generate_chemical_qr_data",
     "generate_location_string",
     "validate_storage_condition",
     "calculate_stock_status",
+    "calculate_stock_status_batch",
     "calculate_properties_in_background",
+    "calculate_properties_in_background_batch",
+    "stream_properties_in_background",
     "estimate_cas_from_smiles",
+    "validate_cas_formats_batch",
     "validate_and_suggest_name",
     "generate_compound_summary",
     "get_calculation_progress",
-    
-    # Notification utilities
+)
+
+_NOTIFICATION_NAMES = (
     "NotificationService",
     "notification_service",
     "check_and_notify_low_stock",
-    "send_daily_stock_report"
-]
\ No newline at end of file
+    "send_daily_stock_report",
+    "invalidate_admin_cache",
+)
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    **dict.fromkeys(_CHEMICAL_NAMES, "chemical_utils"),
+    **dict.fromkeys(_NOTIFICATION_NAMES, "notifications"),
+}
+
+__all__ = [*_CHEMICAL_NAMES, *_NOTIFICATION_NAMES]
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    # Cache on the package so the next lookup skips __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted([*globals(), *__all__])
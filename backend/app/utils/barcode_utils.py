@@ -1,38 +1,61 @@
 import io
+import threading
+from functools import lru_cache
 import segno
 from barcode import Code128
-from barcode.writer import ImageWriter
+from barcode.writer import ImageWriter, SVGWriter
 from app.schemas import BarcodeType
 
-def generate_barcode_image(data: str, barcode_type: BarcodeType) -> io.BytesIO:
+# Reprints of the same label come straight from here instead of re-rendering
+BARCODE_CACHE_SIZE = 1024
+
+# One scratch buffer per thread, rewound between renders instead of reallocated
+_buffers = threading.local()
+
+# Writers are built once and reused; they keep per-render state, so renders are serialized
+_WRITERS = {"png": ImageWriter(), "svg": SVGWriter()}
+_writer_lock = threading.Lock()
+
+def _render(write) -> bytes:
+    """Run ``write(buffer)`` on this thread's scratch buffer and return the bytes written"""
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None:
+        buffer = _buffers.buffer = io.BytesIO()
+    buffer.seek(0)
+    buffer.truncate(0)
+    write(buffer)
+    return buffer.getvalue()
+
+def generate_barcode_image(data: str, barcode_type: BarcodeType, kind: str = "png") -> io.BytesIO:
     """Generate barcode image"""
     if barcode_type == BarcodeType.CODE128:
-        return generate_code128_barcode(data)
+        return generate_code128_barcode(data, kind)
     else:
         raise ValueError(f"Unsupported barcode type: {barcode_type}")
 
-def generate_code128_barcode(data: str) -> io.BytesIO:
-    """Generate Code128 barcode"""
-    buffer = io.BytesIO()
-    
-    # Generate barcode
-    code128 = Code128(data, writer=ImageWriter())
-    code128.write(buffer)
-    
-    buffer.seek(0)
-    return buffer
+def generate_code128_barcode(data: str, kind: str = "png") -> io.BytesIO:
+    """Generate Code128 barcode - PNG by default, ``kind="svg"`` skips raster encoding"""
+    return io.BytesIO(_code128_bytes(data, kind))
+
+def generate_qr_code(data: str, kind: str = "png") -> io.BytesIO:
+    """Generate QR code - PNG by default, ``kind="svg"`` skips raster encoding"""
+    return io.BytesIO(_qr_bytes(data, kind))
 
-def generate_qr_code(data: str) -> io.BytesIO:
-    """Generate QR code"""
-    buffer = io.BytesIO()
-    
-    # Generate QR code
+@lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def _code128_bytes(data: str, kind: str) -> bytes:
+    writer = _WRITERS.get(kind)
+    if writer is None:
+        raise ValueError(f"Unsupported image kind: {kind}")
+    with _writer_lock:
+        return _render(Code128(data, writer=writer).write)
+
+@lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def _qr_bytes(data: str, kind: str) -> bytes:
+    if kind not in ("png", "svg"):
+        raise ValueError(f"Unsupported image kind: {kind}")
     qr = segno.make(data)
-    qr.save(buffer, kind='png', scale=5)
-    
-    buffer.seek(0)
-    return buffer
+    return _render(lambda buffer: qr.save(buffer, kind=kind, scale=5))
 
 def generate_barcode_data(chemical_id: int, unique_id: str) -> str:
     """Generate barcode data string"""
-    return f"CHEM{chemical_id:06d}_{unique_id[:8]}"
\ No newline at end of file
+    return f"CHEM{chemical_id:06d}_{unique_id[:8]}"
@@ -1,12 +1,98 @@
-from typing import Dict, Any, Optional, List, Tuple
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple
+import asyncio
 import logging
+import os
 import re
 import hashlib
-import uuid
+import json
+import secrets
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from dataclasses import dataclass, fields
+import numpy as np
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+# Batches smaller than this are processed in-process; worker start-up would cost more
+BATCH_PROCESS_THRESHOLD = 256
+# Records per worker task, to amortize pickling
+BATCH_CHUNK_SIZE = 64
+
+# Characters that can appear in SMILES; validation wants at least one of them
+_SMILES_CHAR_RE = re.compile(r'[A-Za-z0-9\[\]()=#@+\-\\/]')
+
+# ==================== RDKIT HELPERS ====================
+
+@lru_cache(maxsize=None)
+def _rdkit():
+    """
+    (Chem, CalcMolFormula, MolWt), imported on first use so importing this
+    module stays cheap; None without RDKit
+    """
+    try:
+        from rdkit import Chem
+        # The C++ average-weight calculation behind Descriptors.MolWt, without
+        # importing the Python descriptor registry
+        from rdkit.Chem.rdMolDescriptors import CalcMolFormula, _CalcMolWt as MolWt
+    except ImportError as e:
+        logger.warning(f"RDKit not available, using placeholder chemistry: {e}")
+        return None
+    return Chem, CalcMolFormula, MolWt
+
+@lru_cache(maxsize=8192)
+def _mol_from_smiles(smiles: str):
+    """
+    Parsed RDKit Mol shared by the helpers below - treat it as read-only.
+    None when RDKit is missing or cannot parse the SMILES.
+    """
+    rdkit = _rdkit()
+    if rdkit is None:
+        return None
+    return rdkit[0].MolFromSmiles(smiles)
+
+def _placeholder_inchikey(smiles: str) -> str:
+    """Stable InChIKey stand-in for when RDKit can't provide one - same value in every process"""
+    return f"INCHIKEY-{hashlib.blake2b(str(smiles).encode(), digest_size=7).hexdigest().upper()}"
+
+@lru_cache(maxsize=8192)
+def _compute_all(smiles: str) -> Optional[Tuple[str, Optional[str], str, float]]:
+    """
+    (canonical SMILES, InChIKey, formula, weight) from a single parse - the one code
+    path behind process_chemical_data and the standalone helpers. Expects stripped
+    SMILES; None if RDKit cannot parse it. Without RDKit, placeholder values.
+    """
+    rdkit = _rdkit()
+    if rdkit is None:
+        return smiles, _placeholder_inchikey(smiles), "C?H?O?", 0.0
+    
+    mol = _mol_from_smiles(smiles)
+    if mol is None:
+        return None
+    return _compute_from_mol(mol)
+
+def _compute_from_mol(mol) -> Tuple[str, Optional[str], str, float]:
+    """
+    (canonical SMILES, InChIKey, formula, weight) for an already-parsed Mol, so callers
+    holding a Mol (e.g. from a batch parse) skip the SMILES round trip. Requires RDKit.
+    """
+    Chem, CalcMolFormula, MolWt = _rdkit()
+    return (
+        Chem.MolToSmiles(mol, canonical=True),
+        Chem.MolToInchiKey(mol) or None,
+        CalcMolFormula(mol),
+        round(MolWt(mol), 4),
+    )
+
+# Deletes backslashes from user-entered SMILES in one C-level pass
+_BACKSLASH_TABLE = str.maketrans('', '', '\\')
+
+def _clean_smiles(smiles: str) -> str:
+    """Normalize user-entered SMILES: drop stray backslashes and surrounding whitespace"""
+    return smiles.translate(_BACKSLASH_TABLE).strip()
+
 # ==================== CORE CHEMICAL FUNCTIONS ====================
 
 def generate_unique_id() -> str:
@@ -14,12 +100,20 @@ def generate_unique_id() -> str:
     Generate a unique identifier for chemicals
     Format: CHEM-{timestamp}-{random}
     """
-    import time
     timestamp = int(time.time())
-    random_part = str(uuid.uuid4())[:8].upper()
+    random_part = secrets.token_hex(4).upper()
     unique_id = f"CHEM-{timestamp}-{random_part}"
     return unique_id
 
+def generate_unique_ids(count: int) -> List[str]:
+    """
+    ``count`` identifiers in the generate_unique_id format, sharing one timestamp
+    and one read from the OS random source
+    """
+    timestamp = int(time.time())
+    random_hex = os.urandom(4 * count).hex().upper()
+    return [f"CHEM-{timestamp}-{random_hex[i:i + 8]}" for i in range(0, 8 * count, 8)]
+
 def generate_barcode(chemical_id: int, chemical_name: str) -> str:
     """
     Generate barcode data for a chemical
@@ -39,29 +133,24 @@ def generate_chemical_qr_data(chemical_data: Dict[str, Any]) -> str:
         "smiles": chemical_data.get("smiles"),
         "molecular_formula": chemical_data.get("molecular_formula")
     }
-    import json
-    return json.dumps(qr_data)
+    return json.dumps(qr_data, separators=(',', ':'))
+
+# Location hierarchy, outermost first
+_LOCATION_KEYS = ('department', 'lab_name', 'room', 'shelf', 'rack', 'position')
 
 def generate_location_string(location_data: Dict[str, Any]) -> str:
     """
     Generate a formatted location string from location data
     """
-    parts = [
-        location_data.get('department'),
-        location_data.get('lab_name'),
-        location_data.get('room'),
-        location_data.get('shelf'),
-        location_data.get('rack'),
-        location_data.get('position')
-    ]
-    return ' → '.join(filter(None, parts))
+    return ' → '.join(value for key in _LOCATION_KEYS if (value := location_data.get(key)))
+
+_VALID_STORAGE_CONDITIONS = frozenset({'RT', '2-8°C', '-20°C', '-80°C', 'Custom'})
 
 def validate_storage_condition(condition: str) -> bool:
     """
     Validate storage condition
     """
-    valid_conditions = ['RT', '2-8°C', '-20°C', '-80°C', 'Custom']
-    return condition in valid_conditions
+    return condition in _VALID_STORAGE_CONDITIONS
 
 def calculate_stock_status(current_quantity: float, trigger_level: float) -> str:
     """
@@ -76,55 +165,206 @@ def calculate_stock_status(current_quantity: float, trigger_level: float) -> str
     else:
         return "well_stocked"
 
-def process_chemical_data(
+def calculate_stock_status_batch(current_quantities, trigger_levels) -> np.ndarray:
+    """
+    calculate_stock_status over whole columns at once (sequences or arrays of equal
+    length), for inventory tables; returns an array of the same status strings
+    """
+    current = np.asarray(current_quantities, dtype=float)
+    trigger = np.asarray(trigger_levels, dtype=float)
+    return np.select(
+        [current <= 0, current <= trigger, current <= trigger * 2],
+        ["out_of_stock", "low_stock", "adequate"],
+        default="well_stocked",
+    )
+
+@dataclass(slots=True)
+class ChemicalRecord:
+    """
+    Processed chemical ready for insertion - a fixed slotted layout, so large imports
+    hold far less memory than the equivalent dicts
+    """
+    unique_id: str
+    barcode: str  # Will be generated after chemical creation
+    name: str
+    cas_number: str
+    smiles: str
+    canonical_smiles: str
+    inchikey: str
+    molecular_formula: str
+    molecular_weight: float
+    initial_quantity: float
+    initial_unit: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The dict shape returned by process_chemical_data"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+def process_chemical_record(
     smiles: str, 
     name: str, 
     cas_number: str, 
     initial_quantity: float = 0.0, 
     initial_unit: str = "g"
-) -> Dict[str, Any]:
+) -> ChemicalRecord:
     """
     Process chemical data and calculate additional properties
     """
     try:
-        processed_data = {
-            "unique_id": generate_unique_id(),
-            "barcode": "",  # Will be generated after chemical creation
-            "name": name,
-            "cas_number": cas_number,
-            "smiles": smiles,
-            "canonical_smiles": canonicalize_smiles(smiles),
-            "inchikey": generate_inchikey(smiles),
-            "molecular_formula": "",
-            "molecular_weight": 0.0,
-            "initial_quantity": initial_quantity,
-            "initial_unit": initial_unit
-        }
+        # One parse gives canonical SMILES, InChIKey, formula and weight together
+        computed = _compute_all(smiles.strip())
+        if computed is None:
+            raise ValueError(f"Could not parse SMILES: {smiles}")
+        canonical_smiles, inchikey, formula, weight = computed
         
-        # Calculate molecular properties
-        formula, weight = calculate_molecular_properties(smiles)
-        if formula and weight:
-            processed_data["molecular_formula"] = formula
-            processed_data["molecular_weight"] = weight
+        # Molecular properties are only kept when both were calculated
+        if not (formula and weight):
+            formula, weight = "", 0.0
         
-        return processed_data
+        return ChemicalRecord(
+            unique_id=generate_unique_id(),
+            barcode="",
+            name=name,
+            cas_number=cas_number,
+            smiles=smiles,
+            canonical_smiles=canonical_smiles,
+            inchikey=inchikey,
+            molecular_formula=formula,
+            molecular_weight=weight,
+            initial_quantity=initial_quantity,
+            initial_unit=initial_unit
+        )
     except Exception as e:
         logger.error(f"Error processing chemical data: {e}")
         # Return basic data even if processing fails
-        return {
-            "unique_id": generate_unique_id(),
-            "barcode": "",
-            "name": name,
-            "cas_number": cas_number,
-            "smiles": smiles,
-            "canonical_smiles": smiles,
-            "inchikey": f"INCHIKEY_{hash(smiles)}",
-            "molecular_formula": "",
-            "molecular_weight": 0.0,
-            "initial_quantity": initial_quantity,
-            "initial_unit": initial_unit
-        }
+        return ChemicalRecord(
+            unique_id=generate_unique_id(),
+            barcode="",
+            name=name,
+            cas_number=cas_number,
+            smiles=smiles,
+            canonical_smiles=smiles,
+            inchikey=_placeholder_inchikey(smiles),
+            molecular_formula="",
+            molecular_weight=0.0,
+            initial_quantity=initial_quantity,
+            initial_unit=initial_unit
+        )
 
+def process_chemical_data(
+    smiles: str, 
+    name: str, 
+    cas_number: str, 
+    initial_quantity: float = 0.0, 
+    initial_unit: str = "g"
+) -> Dict[str, Any]:
+    """
+    Process chemical data and calculate additional properties, as a dict
+    """
+    return process_chemical_record(smiles, name, cas_number, initial_quantity, initial_unit).to_dict()
+
+def _process_chemical_record(record: Dict[str, Any]) -> ChemicalRecord:
+    """process_chemical_record for one record dict - module level so worker processes can run it"""
+    return process_chemical_record(
+        record["smiles"],
+        record["name"],
+        record["cas_number"],
+        record.get("initial_quantity", 0.0),
+        record.get("initial_unit", "g")
+    )
+
+def process_chemical_data_batch(
+    records: List[Dict[str, Any]], n_workers: Optional[int] = None
+) -> List[ChemicalRecord]:
+    """
+    process_chemical_record for many records (smiles, name, cas_number and optionally
+    initial_quantity/initial_unit), preserving input order. Large batches are spread
+    over a process pool since the RDKit work is CPU-bound.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1 or len(records) < BATCH_PROCESS_THRESHOLD:
+        return [_process_chemical_record(record) for record in records]
+    
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(_process_chemical_record, records, chunksize=BATCH_CHUNK_SIZE))
+
+def _parse_smiles_threaded(smiles_list: List[str]) -> Optional[List[Any]]:
+    """
+    Parse SMILES on RDKit's C++ thread pool (MultithreadedSmilesMolSupplier), returning
+    Mols in input order with None for failures. None if this RDKit build lacks the supplier.
+    """
+    supplier_class = getattr(_rdkit()[0], "MultithreadedSmilesMolSupplier", None)
+    if supplier_class is None:
+        return None
+    
+    # The supplier reads from a file; the line index rides along as the molecule name
+    with tempfile.NamedTemporaryFile("w", suffix=".smi", delete=False) as handle:
+        handle.writelines(f"{smiles} {index}\n" for index, smiles in enumerate(smiles_list) if smiles)
+        path = handle.name
+    
+    mols = [None] * len(smiles_list)
+    try:
+        supplier = supplier_class(
+            path, delimiter=" ", smilesColumn=0, nameColumn=1, titleLine=False,
+            numWriterThreads=os.cpu_count() or 1
+        )
+        for mol in supplier:
+            if mol is not None:
+                mols[int(mol.GetProp("_Name"))] = mol
+    finally:
+        os.remove(path)
+    return mols
+
+def process_chemicals_batch(smiles_list: List[str]) -> List[Optional[Tuple[str, Optional[str], str, float]]]:
+    """
+    (canonical SMILES, InChIKey, formula, weight) for many SMILES, in input order; None
+    for unparsable entries. Large batches are parsed on RDKit's C++ thread pool, falling
+    back to the memoized serial path when that isn't available.
+    """
+    cleaned = [smiles.strip() if isinstance(smiles, str) else "" for smiles in smiles_list]
+    
+    mols = None
+    if _rdkit() is not None and len(cleaned) >= BATCH_PROCESS_THRESHOLD:
+        mols = _parse_smiles_threaded(cleaned)
+    if mols is None:
+        return [_compute_all(smiles) if smiles else None for smiles in cleaned]
+    return [_compute_from_mol(mol) if mol is not None else None for mol in mols]
+
+def process_chemicals_to_arrays(smiles_list: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Column-oriented process_chemicals_batch: one array per field, aligned with the
+    input. Unparsable entries are None in the string columns and NaN in molecular_weight.
+    """
+    count = len(smiles_list)
+    columns = {
+        "canonical_smiles": np.empty(count, dtype=object),
+        "inchikey": np.empty(count, dtype=object),
+        "molecular_formula": np.empty(count, dtype=object),
+        "molecular_weight": np.full(count, np.nan),
+    }
+    for index, computed in enumerate(process_chemicals_batch(smiles_list)):
+        if computed is None:
+            continue
+        canonical_smiles, inchikey, formula, weight = computed
+        columns["canonical_smiles"][index] = canonical_smiles
+        columns["inchikey"][index] = inchikey
+        columns["molecular_formula"][index] = formula
+        columns["molecular_weight"][index] = weight
+    return columns
+
+# The helpers below are pure functions of the SMILES string, so they are
+# memoized; call clear_smiles_caches() to reset them all in tests.
+
+def clear_smiles_caches() -> None:
+    """Empty every SMILES-keyed cache in this module, including the shared parsed Mols"""
+    for cached in (
+        _mol_from_smiles, _compute_all, validate_chemical_structure,
+        canonicalize_smiles, generate_inchikey, calculate_molecular_properties,
+        estimate_cas_from_smiles,
+    ):
+        cached.cache_clear()
+
+@lru_cache(maxsize=8192)
 def validate_chemical_structure(smiles: str) -> bool:
     """
     Validate chemical structure using SMILES
@@ -132,47 +372,46 @@ def validate_chemical_structure(smiles: str) -> bool:
     try:
         if not smiles or not isinstance(smiles, str):
             return False
-        # Basic validation - check if it contains common chemical symbols
-        chemical_pattern = r'[CHONPSBIFClBr\[\]\(\)=#@\+\-\\\/]'
-        return bool(re.search(chemical_pattern, smiles)) and len(smiles) > 2
+        # Basic validation - check if it contains SMILES characters
+        if not (_SMILES_CHAR_RE.search(smiles) and len(smiles) > 2):
+            return False
+        # With RDKit available the structure must also parse
+        return _rdkit() is None or _mol_from_smiles(smiles.strip()) is not None
     except Exception as e:
         logger.error(f"Error validating chemical structure: {e}")
         return False
 
+@lru_cache(maxsize=8192)
 def canonicalize_smiles(smiles: str) -> Optional[str]:
     """Canonicalize SMILES string"""
     try:
-        # Placeholder - implement with actual chemistry library like RDKit
-        # For now, return the original SMILES
-        return smiles.strip()
+        computed = _compute_all(smiles.strip())
+        return computed[0] if computed else None
     except Exception as e:
         logger.error(f"Error canonicalizing SMILES: {e}")
         return None
 
+@lru_cache(maxsize=8192)
 def generate_inchikey(smiles: str) -> Optional[str]:
     """Generate InChIKey from SMILES"""
     try:
-        # Placeholder - implement with actual chemistry library
-        # For now, generate a hash-based pseudo-InChIKey
-        clean_smiles = smiles.strip()
-        hash_obj = hashlib.md5(clean_smiles.encode())
-        hash_hex = hash_obj.hexdigest()[:14].upper()
-        return f"INCHIKEY-{hash_hex}"
+        computed = _compute_all(smiles.strip())
+        return computed[1] if computed else None
     except Exception as e:
         logger.error(f"Error generating InChIKey: {e}")
         return None
 
+@lru_cache(maxsize=8192)
 def calculate_molecular_properties(smiles: str) -> Tuple[Optional[str], Optional[float]]:
     """Calculate molecular formula and weight"""
     try:
-        # Placeholder - implement with actual chemistry library
-        # For now, return placeholder values
-        return "C?H?O?", 0.0
+        computed = _compute_all(smiles.strip())
+        return (computed[2], computed[3]) if computed else (None, None)
     except Exception as e:
         logger.error(f"Error calculating molecular properties: {e}")
         return None, None
 
-# ==================== ENHANCED FUNCTIONS (From Your Previous Code) ====================
+# ==================== ENHANCED FUNCTIONS ====================
 
 def calculate_properties_in_background(smiles: str) -> Dict[str, Any]:
     """
@@ -187,7 +426,7 @@ def calculate_properties_in_background(smiles: str) -> Dict[str, Any]:
     }
     
     try:
-        clean_smiles = smiles.replace('\\', '').strip()
+        clean_smiles = _clean_smiles(smiles)
         
         # Step 1: Validate structure
         results['steps_completed'].append('structure_validation')
@@ -196,27 +435,27 @@ def calculate_properties_in_background(smiles: str) -> Dict[str, Any]:
             results['error'] = 'Invalid chemical structure'
             return results
         
+        # Steps 2-4 come from the same single parse as process_chemical_data
+        computed = _compute_all(clean_smiles)
+        
         # Step 2: Canonicalize SMILES
         results['steps_completed'].append('canonicalization')
-        canonical_smiles = canonicalize_smiles(clean_smiles)
-        if not canonical_smiles:
+        if not computed:
             results['status'] = 'error'
             results['error'] = 'Failed to canonicalize SMILES'
             return results
+        canonical_smiles, inchikey, formula, molecular_weight = computed
         
         results['properties']['canonical_smiles'] = canonical_smiles
         
         # Step 3: Calculate molecular properties
         results['steps_completed'].append('property_calculation')
-        formula, molecular_weight = calculate_molecular_properties(canonical_smiles)
-        
         if formula and molecular_weight:
             results['properties']['molecular_formula'] = formula
             results['properties']['molecular_weight'] = molecular_weight
         
         # Step 4: Generate InChIKey
         results['steps_completed'].append('inchikey_generation')
-        inchikey = generate_inchikey(canonical_smiles)
         if inchikey:
             results['properties']['inchikey'] = inchikey
         
@@ -230,43 +469,78 @@ def calculate_properties_in_background(smiles: str) -> Dict[str, Any]:
     
     return results
 
+def calculate_properties_in_background_batch(
+    smiles_list: List[str], max_workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    calculate_properties_in_background for many SMILES on a thread pool (RDKit
+    releases the GIL in its C++ calls), preserving input order
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        return list(executor.map(calculate_properties_in_background, smiles_list))
+
+async def stream_properties_in_background(
+    smiles_list: List[str], max_workers: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Async variant of calculate_properties_in_background_batch that yields each result
+    as soon as it is ready - completion order, so match results up by their 'smiles'
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+    try:
+        pending = [
+            loop.run_in_executor(executor, calculate_properties_in_background, smiles)
+            for smiles in smiles_list
+        ]
+        for next_result in asyncio.as_completed(pending):
+            yield await next_result
+    finally:
+        # Not the executor's context manager: its shutdown(wait=True) would block the event
+        # loop until every queued SMILES ran when the consumer stops early or is cancelled
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# Known compounds CAS mapping
+_KNOWN_CAS = {
+    'CC(=O)Oc1ccccc1C(=O)O': '50-78-2',  # Aspirin
+    'CN1C=NC2=C1C(=O)N(C(=O)N2C)C': '58-08-2',  # Caffeine
+    'CCO': '64-17-5',  # Ethanol
+    'CC(=O)O': '64-19-7',  # Acetic Acid
+    'c1ccccc1': '71-43-2',  # Benzene
+    'C1CCCCC1': '110-82-7',  # Cyclohexane
+    'O=C=O': '124-38-9',  # Carbon Dioxide
+    'C#N': '74-90-8',  # Hydrogen Cyanide
+    'CCCCCC': '110-54-3',  # Hexane
+    'CCOC(=O)C': '141-78-6',  # Ethyl Acetate
+}
+
+@lru_cache(maxsize=None)
+def _known_cas_canonical() -> Dict[str, str]:
+    """_KNOWN_CAS keyed by canonical SMILES, built once on first use (RDKit loads lazily)"""
+    return {canonicalize_smiles(smiles) or smiles: cas for smiles, cas in _KNOWN_CAS.items()}
+
+def _pseudo_cas(smiles: str) -> str:
+    """Deterministic CAS-like number derived from the SMILES string"""
+    first, second, third = hashlib.blake2b(smiles.encode(), digest_size=3).digest()
+    return f"{first:02d}-{second:02d}-{third}"
+
+@lru_cache(maxsize=4096)
 def estimate_cas_from_smiles(smiles: str) -> Optional[str]:
     """
     Attempt to estimate CAS number from SMILES pattern
     This is a fallback when external services fail
     """
     try:
-        clean_smiles = smiles.replace('\\', '').strip()
-        
-        # Known compounds CAS mapping
-        known_cas_mapping = {
-            'CC(=O)Oc1ccccc1C(=O)O': '50-78-2',  # Aspirin
-            'CN1C=NC2=C1C(=O)N(C(=O)N2C)C': '58-08-2',  # Caffeine
-            'CCO': '64-17-5',  # Ethanol
-            'CC(=O)O': '64-19-7',  # Acetic Acid
-            'c1ccccc1': '71-43-2',  # Benzene
-            'C1CCCCC1': '110-82-7',  # Cyclohexane
-            'O=C=O': '124-38-9',  # Carbon Dioxide
-            'C#N': '74-90-8',  # Hydrogen Cyanide
-            'CCCCCC': '110-54-3',  # Hexane
-            'CCOC(=O)C': '141-78-6',  # Ethyl Acetate,
-        }
+        clean_smiles = _clean_smiles(smiles)
         
-        # Exact match
-        if clean_smiles in known_cas_mapping:
-            return known_cas_mapping[clean_smiles]
-        
-        # Try canonical SMILES match
-        canonical = canonicalize_smiles(clean_smiles)
-        if canonical and canonical in known_cas_mapping:
-            return known_cas_mapping[canonical]
+        # Exact match first, then any spelling of the same structure
+        cas = _KNOWN_CAS.get(clean_smiles) or _known_cas_canonical().get(canonicalize_smiles(clean_smiles))
+        if cas:
+            return cas
         
         # Generate systematic CAS-like number based on structure
         if len(clean_smiles) > 5:
-            hash_obj = hashlib.md5(clean_smiles.encode())
-            hash_hex = hash_obj.hexdigest()[:6]
-            pseudo_cas = f"{int(hash_hex[:2], 16):02d}-{int(hash_hex[2:4], 16):02d}-{int(hash_hex[4:6], 16)}"
-            return pseudo_cas
+            return _pseudo_cas(clean_smiles)
         
     except Exception as e:
         logger.warning(f"CAS estimation failed for {smiles}: {e}")
@@ -284,7 +558,7 @@ def validate_and_suggest_name(smiles: str, current_name: Optional[str] = None) -
     }
     
     try:
-        clean_smiles = smiles.replace('\\', '').strip()
+        clean_smiles = _clean_smiles(smiles)
         
         if not current_name or current_name.strip() == '':
             suggestions['suggestions'].append('Chemical name is required')
@@ -316,44 +590,54 @@ def validate_and_suggest_name(smiles: str, current_name: Optional[str] = None) -
     
     return suggestions
 
+# Whole-SMILES matches for well-known compounds
+_EXACT_NAMES = {
+    'CCO': 'Ethanol',
+    'CC(=O)O': 'Acetic Acid',
+    'CC(=O)Oc1ccccc1C(=O)O': 'Aspirin',
+    'CN1C=NC2=C1C(=O)N(C(=O)N2C)C': 'Caffeine',
+    'c1ccccc1': 'Benzene',
+    'C1CCCCC1': 'Cyclohexane',
+    'O=C=O': 'Carbon Dioxide',
+    'C#N': 'Hydrogen Cyanide',
+    'CCCCCC': 'Hexane',
+    'CCOC(=O)C': 'Ethyl Acetate',
+    'CC(N)C': 'Isopropylamine',
+}
+
+# Substructure fragments checked in order when there is no exact match; first match wins
+_NAME_FRAGMENTS = (
+    ('C(=O)OC', 'Ester'),
+    ('C(=O)N', 'Amide'),
+    ('C(=O)O', 'Carboxylic Acid'),
+    ('NC(=O)', 'Amide'),
+    ('Oc1ccccc1', 'Phenol'),
+    ('Cc1ccccc1', 'Toluene Derivative'),
+)
+
 def _guess_compound_name_from_smiles(smiles: str) -> Optional[str]:
     """Guess compound name from SMILES pattern"""
-    patterns = {
-        r'CCO$': 'Ethanol',
-        r'CC(=O)O$': 'Acetic Acid',
-        r'CC(=O)Oc1ccccc1C(=O)O$': 'Aspirin',
-        r'CN1C=NC2=C1C(=O)N(C(=O)N2C)C$': 'Caffeine',
-        r'c1ccccc1$': 'Benzene',
-        r'C1CCCCC1$': 'Cyclohexane',
-        r'O=C=O$': 'Carbon Dioxide',
-        r'C#N$': 'Hydrogen Cyanide',
-        r'CCCCCC$': 'Hexane',
-        r'CCOC(=O)C$': 'Ethyl Acetate',
-        r'CC(N)C$': 'Isopropylamine',
-        r'C(=O)OC': 'Ester',
-        r'C(=O)N': 'Amide',
-        r'C(=O)O': 'Carboxylic Acid',
-        r'NC(=O)': 'Amide',
-        r'Oc1ccccc1': 'Phenol',
-        r'Cc1ccccc1': 'Toluene Derivative',
-    }
+    name = _EXACT_NAMES.get(smiles)
+    if name:
+        return name
     
-    for pattern, name in patterns.items():
-        if re.search(pattern, smiles):
+    for fragment, name in _NAME_FRAGMENTS:
+        if fragment in smiles:
             return name
     
     return None
 
+# Fragments typical of systematic IUPAC names; one alternation finds any of them in a single scan
+_SYSTEMATIC_INDICATORS = (
+    'acid', 'amide', 'amine', 'ane', 'ene', 'yne', 'ol', 'al', 'one',
+    'oic', 'carboxylic', 'hydroxy', 'methoxy', 'ethoxy', 'phenyl',
+    'benz', 'cyclo', 'methyl', 'ethyl', 'propyl', 'butyl'
+)
+_SYSTEMATIC_RE = re.compile('|'.join(map(re.escape, _SYSTEMATIC_INDICATORS)))
+
 def _looks_like_systematic_name(name: str) -> bool:
     """Check if name looks like a systematic IUPAC name"""
-    systematic_indicators = [
-        'acid', 'amide', 'amine', 'ane', 'ene', 'yne', 'ol', 'al', 'one',
-        'oic', 'carboxylic', 'hydroxy', 'methoxy', 'ethoxy', 'phenyl',
-        'benz', 'cyclo', 'methyl', 'ethyl', 'propyl', 'butyl'
-    ]
-    
-    name_lower = name.lower()
-    return any(indicator in name_lower for indicator in systematic_indicators)
+    return _SYSTEMATIC_RE.search(name.lower()) is not None
 
 def generate_compound_summary(smiles: str, name: str, cas_number: str) -> Dict[str, Any]:
     """
@@ -374,20 +658,22 @@ def generate_compound_summary(smiles: str, name: str, cas_number: str) -> Dict[s
     }
     
     try:
-        clean_smiles = smiles.replace('\\', '').strip()
+        clean_smiles = _clean_smiles(smiles)
         
         # Structure validation
         summary['validation']['structure_valid'] = validate_chemical_structure(clean_smiles)
         
-        if summary['validation']['structure_valid']:
+        # Formula, weight and InChIKey all come from the one cached parse
+        computed = _compute_all(clean_smiles) if summary['validation']['structure_valid'] else None
+        if computed:
+            _, inchikey, formula, weight = computed
+            
             # Calculate properties
-            formula, weight = calculate_molecular_properties(clean_smiles)
             if formula and weight:
                 summary['calculated_properties']['molecular_formula'] = formula
                 summary['calculated_properties']['molecular_weight'] = weight
             
             # Generate InChIKey
-            inchikey = generate_inchikey(clean_smiles)
             if inchikey:
                 summary['calculated_properties']['inchikey'] = inchikey
         
@@ -424,24 +710,24 @@ def generate_compound_summary(smiles: str, name: str, cas_number: str) -> Dict[s
     
     return summary
 
+# CAS number layout: 2+ digits, 2+ digits, one check digit
+_CAS_FORMAT_RE = re.compile(r'[0-9]{2,}-[0-9]{2,}-[0-9]')
+
+@lru_cache(maxsize=2048)
 def _validate_cas_format(cas_number: str) -> bool:
     """Validate CAS number format (basic check)"""
     try:
-        parts = cas_number.split('-')
-        if len(parts) != 3:
-            return False
-        
-        if not (parts[0].isdigit() and parts[1].isdigit() and parts[2].isdigit()):
-            return False
-        
-        if len(parts[0]) < 2 or len(parts[1]) < 2 or len(parts[2]) != 1:
-            return False
-            
-        return True
-        
-    except:
+        return _CAS_FORMAT_RE.fullmatch(cas_number) is not None
+    except TypeError:
         return False
 
+def validate_cas_formats_batch(cas_numbers) -> np.ndarray:
+    """_validate_cas_format over a whole column of CAS numbers, as a bool array"""
+    return np.fromiter(
+        (isinstance(cas, str) and _validate_cas_format(cas) for cas in cas_numbers),
+        dtype=bool, count=len(cas_numbers)
+    )
+
 def get_calculation_progress(smiles: str, step: int) -> Dict[str, Any]:
     """
     Simulate real-time calculation progress
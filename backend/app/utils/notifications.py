@@ -1,11 +1,16 @@
+import atexit
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
 import logging
-from typing import List, Optional
+import ssl
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, List, Optional
 import os
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
+from jinja2 import Environment
+from sqlalchemy.orm import Session, joinedload
 
 from app.models import Chemical, Stock, Alert, User
 
@@ -13,31 +18,26 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-class NotificationService:
-    def __init__(self):
-        self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        self.smtp_username = os.getenv("SMTP_USERNAME")
-        self.smtp_password = os.getenv("SMTP_PASSWORD")
-        self.from_email = os.getenv("SMTP_USERNAME", "noreply@smartchemview.com")
-    
-    def send_low_stock_alert(self, chemical: Chemical, stock: Stock, recipients: List[str]) -> bool:
-        """Send low stock alert email"""
-        subject = f"🚨 Low Stock Alert: {chemical.name}"
-        
-        # Create email content
-        body = f"""
+# Providers throttle long-lived sessions, so start a fresh one after this many messages
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100
+
+# Admin recipients rarely change; re-read them at most this often (seconds)
+ADMIN_CACHE_TTL = 60.0
+_admin_cache = {"emails": None, "expires": 0.0}
+_admin_cache_lock = threading.Lock()
+
+_LOW_STOCK_ALERT_TEMPLATE = """
         <html>
         <body>
             <h2>Low Stock Alert</h2>
             <p>The following chemical is running low on stock:</p>
             
             <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0;">
-                <h3>{chemical.name}</h3>
-                <p><strong>CAS Number:</strong> {chemical.cas_number}</p>
-                <p><strong>Current Stock:</strong> {stock.current_quantity} {stock.unit}</p>
-                <p><strong>Trigger Level:</strong> {stock.trigger_level} {stock.unit}</p>
-                <p><strong>Molecular Formula:</strong> {chemical.molecular_formula or 'N/A'}</p>
+                <h3>{{ chemical.name }}</h3>
+                <p><strong>CAS Number:</strong> {{ chemical.cas_number }}</p>
+                <p><strong>Current Stock:</strong> {{ stock.current_quantity }} {{ stock.unit }}</p>
+                <p><strong>Trigger Level:</strong> {{ stock.trigger_level }} {{ stock.unit }}</p>
+                <p><strong>Molecular Formula:</strong> {{ chemical.molecular_formula or 'N/A' }}</p>
             </div>
             
             <p>Please consider reordering this chemical soon.</p>
@@ -48,29 +48,18 @@ class NotificationService:
             </p>
         </body>
         </html>
-        """
-        
-        return self._send_email(recipients, subject, body)
-    
-    def send_daily_stock_report(self, low_stock_chemicals: List[tuple], recipients: List[str]) -> bool:
-        """Send daily stock summary report"""
-        subject = "📊 Daily Chemical Stock Report"
-        
-        low_stock_count = len(low_stock_chemicals)
-        
-        body = f"""
+"""
+
+_DAILY_REPORT_TEMPLATE = """
         <html>
         <body>
             <h2>Daily Chemical Stock Report</h2>
             
             <div style="margin: 20px 0;">
                 <h3>Stock Summary</h3>
-                <p><strong>Chemicals with Low Stock:</strong> {low_stock_count}</p>
+                <p><strong>Chemicals with Low Stock:</strong> {{ count }}</p>
             </div>
-        """
-        
-        if low_stock_chemicals:
-            body += """
+            {% if items %}
             <h3>Low Stock Chemicals</h3>
             <table style="width: 100%; border-collapse: collapse; margin: 15px 0;">
                 <thead>
@@ -82,107 +71,241 @@ class NotificationService:
                     </tr>
                 </thead>
                 <tbody>
-            """
-            
-            for chemical, stock in low_stock_chemicals:
-                body += f"""
+                {% for chemical, stock in items %}
                     <tr>
-                        <td style="padding: 10px; border: 1px solid #ddd;">{chemical.name}</td>
-                        <td style="padding: 10px; border: 1px solid #ddd;">{chemical.cas_number}</td>
+                        <td style="padding: 10px; border: 1px solid #ddd;">{{ chemical.name }}</td>
+                        <td style="padding: 10px; border: 1px solid #ddd;">{{ chemical.cas_number }}</td>
                         <td style="padding: 10px; border: 1px solid #ddd; text-align: right; color: #dc2626;">
-                            {stock.current_quantity} {stock.unit}
+                            {{ stock.current_quantity }} {{ stock.unit }}
                         </td>
                         <td style="padding: 10px; border: 1px solid #ddd; text-align: right;">
-                            {stock.trigger_level} {stock.unit}
+                            {{ stock.trigger_level }} {{ stock.unit }}
                         </td>
                     </tr>
-                """
-            
-            body += """
+                {% endfor %}
                 </tbody>
             </table>
-            """
-        
-        body += """
+            {% endif %}
             <hr>
             <p style="color: #666; font-size: 12px;">
                 This is an automated daily report from ReyChemIQ System.
             </p>
         </body>
         </html>
+"""
+
+class _SMTPConnection:
+    """Logged-in SMTP session that is kept open between sends"""
+
+    def __init__(self, host: str, port: int, username: str, password: str, tls_context: ssl.SSLContext):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.tls_context = tls_context
+        self.server: Optional[smtplib.SMTP] = None
+        self.sent = 0
+
+    def connect(self):
+        self.close()
+        server = smtplib.SMTP(self.host, self.port)
+        # starttls() repeats EHLO itself, so login can follow directly
+        server.starttls(context=self.tls_context)
+        server.login(self.username, self.password)
+        self.server = server
+        self.sent = 0
+
+    def noop(self):
+        """Health-check the session, reconnecting if the server has dropped it"""
+        if self.server is None:
+            self.connect()
+            return
+        try:
+            self.server.noop()
+        except (smtplib.SMTPServerDisconnected, ConnectionResetError):
+            self.connect()
+
+    def close(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.server = None
+
+class NotificationService:
+    def __init__(self):
+        self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
+        self.smtp_username = os.getenv("SMTP_USERNAME")
+        self.smtp_password = os.getenv("SMTP_PASSWORD")
+        self.from_email = os.getenv("SMTP_USERNAME", "noreply@smartchemview.com")
+        # Shared SMTP session; sends are serialized because smtplib isn't thread-safe
+        self._smtp_server_instance: Optional[_SMTPConnection] = None
+        self._smtp_lock = threading.Lock()
+        # Built once: loading the CA store on every reconnect is the costly part of setup
+        self._tls_context = ssl.create_default_context()
+        # Email bodies are compiled once; each send only renders the bindings
+        templates = Environment(autoescape=True)
+        self._alert_tpl = templates.from_string(_LOW_STOCK_ALERT_TEMPLATE)
+        self._report_tpl = templates.from_string(_DAILY_REPORT_TEMPLATE)
+        # Single background sender: queued mail goes out in order over the shared session
+        self._outbox = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp-outbox")
+        atexit.register(self.shutdown)
+    
+    def send_low_stock_alert(self, chemical: Chemical, stock: Stock, recipients: List[str],
+                             background: bool = False) -> bool:
+        """
+        Send low stock alert email. With ``background=True`` it is queued and True only
+        means "queued" - delivery failures are logged by the sender, not returned
         """
+        subject = f"🚨 Low Stock Alert: {chemical.name}"
+        
+        # Create email content
+        body = self._alert_tpl.render(chemical=chemical, stock=stock)
+        
+        if background:
+            self.enqueue(self._build_message(recipients, subject, body))
+            return True
+        return self._send_email(recipients, subject, body)
+    
+    def send_daily_stock_report(self, low_stock_chemicals: List[tuple], recipients: List[str]) -> bool:
+        """Send daily stock summary report"""
+        subject = "📊 Daily Chemical Stock Report"
+        
+        body = self._report_tpl.render(items=low_stock_chemicals, count=len(low_stock_chemicals))
         
         return self._send_email(recipients, subject, body)
     
     def _send_email(self, recipients: List[str], subject: str, body: str) -> bool:
         """Send email using SMTP"""
-        if not self.smtp_username or not self.smtp_password:
-            logger.warning("SMTP credentials not configured. Email notification skipped.")
+        msg = self._build_message(recipients, subject, body)
+        if not self.send_batch([msg]):
             return False
-        
-        try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.from_email
-            msg['To'] = ", ".join(recipients)
-            msg['Subject'] = subject
-            
-            # Add HTML body
-            msg.attach(MIMEText(body, 'html'))
-            
-            # Connect to SMTP server and send
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
-            
-            logger.info(f"Email sent successfully to {recipients}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send email: {e}")
+        logger.info(f"Email sent successfully to {recipients}")
+        return True
+
+    def enqueue(self, msg: EmailMessage) -> Future:
+        """Hand a prepared message to the background sender without waiting on SMTP"""
+        return self._outbox.submit(self._send_queued, msg)
+
+    def _send_queued(self, msg: EmailMessage) -> bool:
+        if not self.send_batch([msg]):
             return False
+        logger.info(f"Email sent successfully to {msg['To']}")
+        return True
+
+    def _build_message(self, recipients: List[str], subject: str, body: str) -> EmailMessage:
+        # A single HTML part - no multipart container needed
+        msg = EmailMessage()
+        msg['From'] = self.from_email
+        msg['To'] = ", ".join(recipients)
+        msg['Subject'] = subject
+        msg.set_content(body, subtype='html')
+        return msg
+
+    def send_batch(self, messages: Iterable[EmailMessage]) -> int:
+        """Send prepared messages over one SMTP session, returns how many went out"""
+        if not self.smtp_username or not self.smtp_password:
+            logger.warning("SMTP credentials not configured. Email notification skipped.")
+            return 0
+
+        sent = 0
+        with self._smtp_lock:
+            try:
+                connection = self._open_smtp()
+                for msg in messages:
+                    if connection.sent >= SMTP_MAX_MESSAGES_PER_CONNECTION:
+                        connection.connect()
+                    self._send_via(connection.server, msg)
+                    connection.sent += 1
+                    sent += 1
+            except Exception as e:
+                logger.error(f"Failed to send email: {e}")
+                # Don't reuse a session left in an unknown state
+                self.close()
+        return sent
+
+    def _open_smtp(self) -> _SMTPConnection:
+        """Return the cached SMTP session, (re)connecting as needed"""
+        connection = self._smtp_server_instance
+        if connection is None:
+            connection = self._smtp_server_instance = _SMTPConnection(
+                self.smtp_server, self.smtp_port, self.smtp_username, self.smtp_password,
+                self._tls_context
+            )
+        if connection.sent >= SMTP_MAX_MESSAGES_PER_CONNECTION:
+            connection.connect()
+        else:
+            connection.noop()
+        return connection
+
+    def _send_via(self, server: smtplib.SMTP, msg: EmailMessage):
+        server.send_message(msg)
+
+    def close(self):
+        """Close the cached SMTP session, if any"""
+        if self._smtp_server_instance is not None:
+            self._smtp_server_instance.close()
+
+    def shutdown(self):
+        """Send everything still queued, then close the SMTP session - registered with atexit"""
+        self._outbox.shutdown(wait=True)
+        with self._smtp_lock:
+            self.close()
 
 # Global notification service instance
 notification_service = NotificationService()
 
+def _admin_recipient_emails(db: Session) -> List[str]:
+    """Email addresses of active admin users, cached for ADMIN_CACHE_TTL seconds"""
+    with _admin_cache_lock:
+        if _admin_cache["emails"] is not None and time.monotonic() < _admin_cache["expires"]:
+            return _admin_cache["emails"]
+    rows = db.query(User.email).filter(User.role == 'admin', User.is_active == True).all()
+    emails = [email for (email,) in rows]
+    with _admin_cache_lock:
+        _admin_cache["emails"] = emails
+        _admin_cache["expires"] = time.monotonic() + ADMIN_CACHE_TTL
+    return emails
+
+def invalidate_admin_cache():
+    """Drop the cached admin recipients - call after adding, removing or deactivating an admin"""
+    with _admin_cache_lock:
+        _admin_cache["emails"] = None
+
 def check_and_notify_low_stock(db: Session, chemical_id: int):
     """Check stock level and send notifications if low"""
-    from app.crud.stock_crud import get_stock
-    from app.models import Chemical
-    
-    stock = get_stock(db, chemical_id)
-    if not stock or stock.current_quantity > stock.trigger_level:
-        return
-    
-    chemical = db.query(Chemical).filter(Chemical.id == chemical_id).first()
-    if not chemical:
+    # Stock row and its chemical in one round trip, only when it's actually low
+    stock = (
+        db.query(Stock)
+        .options(joinedload(Stock.chemical))
+        .filter(Stock.chemical_id == chemical_id, Stock.is_low)
+        .first()
+    )
+    if not stock or not stock.chemical:
         return
     
     # Get admin users for notification
-    admin_users = db.query(User).filter(User.role == 'admin', User.is_active == True).all()
-    recipient_emails = [user.email for user in admin_users]
+    recipient_emails = _admin_recipient_emails(db)
     
     if recipient_emails:
-        notification_service.send_low_stock_alert(chemical, stock, recipient_emails)
+        # Rendered here while the ORM objects are attached; only the SMTP send is deferred
+        notification_service.send_low_stock_alert(stock.chemical, stock, recipient_emails, background=True)
 
 def send_daily_stock_report(db: Session):
     """Send daily stock report to all admin users"""
-    from app.crud.stock_crud import get_all_stock
-    
-    # Get low stock chemicals
-    all_stock = get_all_stock(db)
-    low_stock_chemicals = []
-    
-    for stock in all_stock:
-        if stock.current_quantity <= stock.trigger_level:
-            chemical = db.query(Chemical).filter(Chemical.id == stock.chemical_id).first()
-            if chemical:
-                low_stock_chemicals.append((chemical, stock))
+    # Get low stock chemicals - the database only returns the low rows
+    low_stock_chemicals = (
+        db.query(Chemical, Stock)
+        .join(Stock, Stock.chemical_id == Chemical.id)
+        .filter(Stock.is_low)
+        .all()
+    )
     
     # Get admin recipients
-    admin_users = db.query(User).filter(User.role == 'admin', User.is_active == True).all()
-    recipient_emails = [user.email for user in admin_users]
+    recipient_emails = _admin_recipient_emails(db)
     
     if recipient_emails and low_stock_chemicals:
         notification_service.send_daily_stock_report(low_stock_chemicals, recipient_emails)
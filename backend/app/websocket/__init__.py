@@ -1,16 +1,62 @@
 from socketio import AsyncServer, ASGIApp
 from socketio.exceptions import ConnectionRefusedError
-import json
-from datetime import datetime
+import orjson
+from dataclasses import dataclass
+from datetime import datetime, timezone
 import logging
-
-from app.schemas import WebSocketMessage
+import sys
+import time
 
 logger = logging.getLogger(__name__)
 
+class _OrjsonCodec:
+    """Drop-in for the ``json`` module that python-socketio/engineio serialize with"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        # socketio passes separators=...; orjson output is already compact
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+# Broadcasts within the same 10ms window share one formatted timestamp
+_TIMESTAMP_BUCKET_NS = 10_000_000
+_timestamp_cache = [-1, '']  # [bucket, ISO string]
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO string with offset, reformatted at most once per bucket"""
+    now_ns = time.time_ns()
+    bucket = now_ns // _TIMESTAMP_BUCKET_NS
+    if bucket != _timestamp_cache[0]:
+        _timestamp_cache[0] = bucket
+        _timestamp_cache[1] = datetime.fromtimestamp(now_ns / 1e9, timezone.utc).isoformat()
+    return _timestamp_cache[1]
+
+def _message(message_type: str, data: dict) -> dict:
+    """Wire form of app.schemas.WebSocketMessage, built without a pydantic round trip"""
+    return {'type': message_type, 'data': data, 'timestamp': _now_iso()}
+
+def _room_has_participants(room: str) -> bool:
+    """True when at least one local client is subscribed to ``room``"""
+    return next(iter(sio.manager.get_participants('/', room)), None) is not None
+
+async def _broadcast(event: str, message_type: str, data: dict, room: str, skip_sid=None) -> bool:
+    """Emit one message to a room; skipped entirely when nobody is listening.
+
+    The packet is encoded once by the Socket.IO manager and the same frame is
+    written to every participant. Returns True if anything was emitted.
+    """
+    if not _room_has_participants(room):
+        return False
+    await sio.emit(event, _message(message_type, data), room=room, skip_sid=skip_sid)
+    return True
+
 # Create Socket.IO server with CORS
 sio = AsyncServer(
     async_mode='asgi', 
+    json=_OrjsonCodec,
     cors_allowed_origins=[
         "http://localhost:3000",
         "http://127.0.0.1:3000",
@@ -20,18 +66,26 @@ sio = AsyncServer(
 )
 socket_app = ASGIApp(sio)
 
+@dataclass(slots=True)
+class ClientInfo:
+    """Bookkeeping for one connected client; connected_at is a Unix timestamp"""
+    connected_at: float
+    user_agent: str
+    remote_addr: str
+
 # Store connected clients
-connected_clients = {}
+connected_clients: dict[str, ClientInfo] = {}
 
 @sio.event
 async def connect(sid, environ):
     """Handle client connection - Allow all connections for now"""
     try:
-        connected_clients[sid] = {
-            'connected_at': datetime.utcnow(),
-            'user_agent': environ.get('HTTP_USER_AGENT', 'Unknown'),
-            'remote_addr': environ.get('REMOTE_ADDR', 'Unknown')
-        }
+        connected_clients[sid] = ClientInfo(
+            connected_at=time.time(),
+            # Few distinct user agents in practice, so share one string per UA
+            user_agent=sys.intern(environ.get('HTTP_USER_AGENT', 'Unknown')),
+            remote_addr=environ.get('REMOTE_ADDR', 'Unknown')
+        )
         logger.info(f"✅ WebSocket client connected: {sid}")
         await sio.emit('connected', {'message': 'Connected to server', 'sid': sid}, room=sid)
     except Exception as e:
@@ -72,68 +126,48 @@ async def subscribe_to_updates(sid, data):
     await sio.emit('subscribed', {'types': update_types}, room=sid)
 
 # Utility functions to broadcast messages
-async def broadcast_chemical_update(chemical_data: dict):
+async def broadcast_chemical_update(chemical_data: dict, skip_sid=None):
     """Broadcast chemical update to all clients"""
     try:
-        message = WebSocketMessage(
-            type='chemical_updated',
-            data=chemical_data,
-            timestamp=datetime.utcnow()
-        )
-        await sio.emit('chemical_update', message.dict(), room='updates_chemicals')
-        logger.info(f"Broadcast chemical update: {chemical_data.get('id', 'unknown')}")
+        if not await _broadcast('chemical_update', 'chemical_updated', chemical_data, 'updates_chemicals', skip_sid):
+            return
+        logger.info("Broadcast chemical update: %s", chemical_data.get('id', 'unknown'))
     except Exception as e:
         logger.error(f"Error broadcasting chemical update: {e}")
 
-async def broadcast_stock_adjustment(adjustment_data: dict):
+async def broadcast_stock_adjustment(adjustment_data: dict, skip_sid=None):
     """Broadcast stock adjustment to all clients"""
     try:
-        message = WebSocketMessage(
-            type='stock_adjusted',
-            data=adjustment_data,
-            timestamp=datetime.utcnow()
-        )
-        await sio.emit('stock_adjustment', message.dict(), room='updates_stock')
-        logger.info(f"Broadcast stock adjustment: {adjustment_data.get('chemical_id', 'unknown')}")
+        if not await _broadcast('stock_adjustment', 'stock_adjusted', adjustment_data, 'updates_stock', skip_sid):
+            return
+        logger.info("Broadcast stock adjustment: %s", adjustment_data.get('chemical_id', 'unknown'))
     except Exception as e:
         logger.error(f"Error broadcasting stock adjustment: {e}")
 
-async def broadcast_new_chemical(chemical_data: dict):
+async def broadcast_new_chemical(chemical_data: dict, skip_sid=None):
     """Broadcast new chemical to all clients"""
     try:
-        message = WebSocketMessage(
-            type='chemical_created',
-            data=chemical_data,
-            timestamp=datetime.utcnow()
-        )
-        await sio.emit('chemical_created', message.dict(), room='updates_chemicals')
-        logger.info(f"Broadcast new chemical: {chemical_data.get('name', 'unknown')}")
+        if not await _broadcast('chemical_created', 'chemical_created', chemical_data, 'updates_chemicals', skip_sid):
+            return
+        logger.info("Broadcast new chemical: %s", chemical_data.get('name', 'unknown'))
     except Exception as e:
         logger.error(f"Error broadcasting new chemical: {e}")
 
-async def broadcast_location_update(location_data: dict):
+async def broadcast_location_update(location_data: dict, skip_sid=None):
     """Broadcast location update to all clients"""
     try:
-        message = WebSocketMessage(
-            type='location_updated',
-            data=location_data,
-            timestamp=datetime.utcnow()
-        )
-        await sio.emit('location_update', message.dict(), room='updates_locations')
-        logger.info(f"Broadcast location update: {location_data.get('id', 'unknown')}")
+        if not await _broadcast('location_update', 'location_updated', location_data, 'updates_locations', skip_sid):
+            return
+        logger.info("Broadcast location update: %s", location_data.get('id', 'unknown'))
     except Exception as e:
         logger.error(f"Error broadcasting location update: {e}")
 
-async def broadcast_low_stock_alert(alert_data: dict):
+async def broadcast_low_stock_alert(alert_data: dict, skip_sid=None):
     """Broadcast low stock alert to all clients"""
     try:
-        message = WebSocketMessage(
-            type='low_stock_alert',
-            data=alert_data,
-            timestamp=datetime.utcnow()
-        )
-        await sio.emit('low_stock_alert', message.dict(), room='updates_alerts')
-        logger.info(f"Broadcast low stock alert: {alert_data.get('chemical_name', 'unknown')}")
+        if not await _broadcast('low_stock_alert', 'low_stock_alert', alert_data, 'updates_alerts', skip_sid):
+            return
+        logger.info("Broadcast low stock alert: %s", alert_data.get('chemical_name', 'unknown'))
     except Exception as e:
         logger.error(f"Error broadcasting low stock alert: {e}")
 
@@ -141,7 +175,7 @@ async def broadcast_low_stock_alert(alert_data: dict):
 @sio.event
 async def ping(sid, data):
     """Handle ping from client"""
-    await sio.emit('pong', {'timestamp': datetime.utcnow().isoformat()}, room=sid)
+    await sio.emit('pong', {'timestamp': _now_iso()}, room=sid)
 
 # Export
 __all__ = ['sio', 'socket_app', 'broadcast_chemical_update', 'broadcast_stock_adjustment', 
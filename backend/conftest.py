@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--live", action="store_true",
+        help="run backend tests over HTTP against a running server instead of in-process"
+    )
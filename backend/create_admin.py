@@ -4,18 +4,20 @@ import os
 # Add the app directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from sqlalchemy import exists
+
 from app.database import SessionLocal
 from app.models import User, UserRole
 from app.auth.auth import get_password_hash
 
 def create_admin_user():
+    """Create the default admin; returns the new User, or None if it already exists or creation failed"""
     db = SessionLocal()
     try:
-        # Check if admin user already exists
-        admin_user = db.query(User).filter(User.email == "admin@example.com").first()
-        if admin_user:
+        # Check if admin user already exists - EXISTS stops at the unique email index
+        if db.query(exists().where(User.email == "admin@example.com")).scalar():
             print("✅ Admin user already exists")
-            return admin_user
+            return None
         
         # Create admin user
         admin_user = User(
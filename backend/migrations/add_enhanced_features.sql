@@ -49,6 +49,8 @@ CREATE INDEX idx_locations_hierarchy ON locations(department, lab_name, room, sh
 CREATE INDEX idx_barcode_images_chemical ON barcode_images(chemical_id);
 CREATE INDEX idx_stock_adjustments_chemical ON stock_adjustments(chemical_id);
 CREATE INDEX idx_stock_adjustments_timestamp ON stock_adjustments(timestamp);
+-- Partial index over just the low-stock rows (SQLite/PostgreSQL)
+CREATE INDEX IF NOT EXISTS idx_stock_low ON stock(chemical_id) WHERE current_quantity <= trigger_level;
 
 -- Insert predefined storage conditions
 INSERT INTO locations (name, department, lab_name, room, shelf, rack, position, storage_conditions) VALUES
@@ -34,8 +34,7 @@ def reset_database():
             is_active=True
         )
         db.add(admin_user)
-        db.commit()
-        db.refresh(admin_user)
+        db.flush()
         
         # Create some sample chemicals
         print("🧪 Creating sample chemicals...")
@@ -66,9 +65,10 @@ def reset_database():
             }
         ]
         
+        from app.utils.chemical_utils import process_chemical_data, generate_barcode
+        
+        chemicals = []
         for chem_data in sample_chemicals:
-            from app.utils.chemical_utils import process_chemical_data
-            
             try:
                 # Process chemical data
                 processed_data = process_chemical_data(
@@ -78,47 +78,46 @@ def reset_database():
                     chem_data["initial_quantity"],
                     chem_data["initial_unit"]
                 )
-                
-                # Create chemical
-                chemical = Chemical(
-                    unique_id=processed_data["unique_id"],
-                    name=processed_data["name"],
-                    cas_number=processed_data["cas_number"],
-                    smiles=processed_data["smiles"],
-                    canonical_smiles=processed_data["canonical_smiles"],
-                    inchikey=processed_data["inchikey"],
-                    molecular_formula=processed_data["molecular_formula"],
-                    molecular_weight=processed_data["molecular_weight"],
-                    initial_quantity=chem_data["initial_quantity"],
-                    initial_unit=chem_data["initial_unit"],
-                    created_by=admin_user.id
-                )
-                
-                db.add(chemical)
-                db.commit()
-                db.refresh(chemical)
-                
-                # Generate barcode
-                from app.utils.chemical_utils import generate_barcode
-                barcode_data, barcode_image = generate_barcode(chemical.id, chemical.unique_id)
-                chemical.barcode = barcode_data
-                db.commit()
-                
-                # Create stock entry
-                stock = Stock(
-                    chemical_id=chemical.id,
-                    current_quantity=chem_data["initial_quantity"],
-                    unit=chem_data["initial_unit"],
-                    trigger_level=50.0
-                )
-                db.add(stock)
-                db.commit()
-                
-                print(f"  ✅ Created {chemical.name}")
-                
             except Exception as e:
                 print(f"  ❌ Failed to create {chem_data['name']}: {e}")
                 continue
+            
+            chemical = Chemical(
+                unique_id=processed_data["unique_id"],
+                name=processed_data["name"],
+                cas_number=processed_data["cas_number"],
+                smiles=processed_data["smiles"],
+                canonical_smiles=processed_data["canonical_smiles"],
+                inchikey=processed_data["inchikey"],
+                molecular_formula=processed_data["molecular_formula"],
+                molecular_weight=processed_data["molecular_weight"],
+                initial_quantity=chem_data["initial_quantity"],
+                initial_unit=chem_data["initial_unit"],
+                created_by=admin_user.id
+            )
+            chemicals.append(chemical)
+        
+        # One flush assigns every chemical ID; barcodes and stock rows ride
+        # along in the single commit below
+        db.add_all(chemicals)
+        db.flush()
+        
+        for chemical in chemicals:
+            chemical.barcode = generate_barcode(chemical.id, chemical.unique_id)
+        
+        db.add_all([
+            Stock(
+                chemical_id=chemical.id,
+                current_quantity=chemical.initial_quantity,
+                unit=chemical.initial_unit,
+                trigger_level=50.0
+            )
+            for chemical in chemicals
+        ])
+        db.commit()
+        
+        for chemical in chemicals:
+            print(f"  ✅ Created {chemical.name}")
         
         print("🎉 Database reset completed successfully!")
         print("📧 Admin login: admin@example.com")
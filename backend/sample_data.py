@@ -1,5 +1,5 @@
 import asyncio
-import random
+import numpy as np
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.models import Chemical, Stock, User
@@ -23,10 +23,14 @@ def create_sample_users(db: Session):
         }
     ]
     
+    # One query for every seed email that is already registered
+    existing_emails = {
+        email for (email,) in
+        db.query(User.email).filter(User.email.in_([user_data["email"] for user_data in users]))
+    }
+    
     for user_data in users:
-        # Check if user already exists
-        existing_user = db.query(User).filter(User.email == user_data["email"]).first()
-        if not existing_user:
+        if user_data["email"] not in existing_emails:
             user = User(
                 email=user_data["email"],
                 hashed_password=get_password_hash(user_data["password"]),
@@ -106,16 +110,21 @@ def create_sample_chemicals(db: Session):
         {"name": "Isopropanol", "cas_number": "67-63-0", "smiles": "CC(O)C"},
     ]
     
-    admin_user = db.query(User).filter(User.role == "admin").first()
+    admin_id = db.query(User.id).filter(User.role == "admin").limit(1).scalar()
+    
+    # One query for every seed chemical already present, matched by CAS number or name
+    existing_cas_numbers, existing_names = set(), set()
+    for cas_number, name in db.query(Chemical.cas_number, Chemical.name).filter(
+        Chemical.cas_number.in_([chem_data["cas_number"] for chem_data in sample_chemicals]) |
+        Chemical.name.in_([chem_data["name"] for chem_data in sample_chemicals])
+    ):
+        existing_cas_numbers.add(cas_number)
+        existing_names.add(name)
     
+    chemicals = []
     for chem_data in sample_chemicals:
-        # Check if chemical already exists
-        existing_chem = db.query(Chemical).filter(
-            (Chemical.cas_number == chem_data["cas_number"]) | 
-            (Chemical.name == chem_data["name"])
-        ).first()
-        
-        if not existing_chem:
+        if (chem_data["cas_number"] not in existing_cas_numbers
+                and chem_data["name"] not in existing_names):
             try:
                 # Process with RDKit
                 processed_data = process_chemical_data(
@@ -123,26 +132,31 @@ def create_sample_chemicals(db: Session):
                     chem_data["name"],
                     chem_data["cas_number"]
                 )
-                
-                chemical = Chemical(
-                    **processed_data,
-                    created_by=admin_user.id
-                )
-                db.add(chemical)
-                db.flush()  # Get the ID
-                
-                # Create stock entry with random quantities
-                stock = Stock(
-                    chemical_id=chemical.id,
-                    current_quantity=round(random.uniform(5, 500), 2),
-                    unit="g",
-                    trigger_level=round(random.uniform(10, 100), 2)
-                )
-                db.add(stock)
-                
             except Exception as e:
                 print(f"❌ Failed to create {chem_data['name']}: {e}")
                 continue
+            
+            chemicals.append(Chemical(
+                **processed_data,
+                created_by=admin_id
+            ))
+    
+    db.add_all(chemicals)
+    db.flush()  # Get the IDs in one round trip
+    
+    # Create stock entries with random quantities, drawn for the whole batch at once
+    rng = np.random.default_rng()
+    quantities = np.round(rng.uniform(5, 500, len(chemicals)), 2).tolist()
+    trigger_levels = np.round(rng.uniform(10, 100, len(chemicals)), 2).tolist()
+    db.add_all([
+        Stock(
+            chemical_id=chemical.id,
+            current_quantity=quantity,
+            unit="g",
+            trigger_level=trigger_level
+        )
+        for chemical, quantity, trigger_level in zip(chemicals, quantities, trigger_levels)
+    ])
     
     db.commit()
     print(f"✅ Created {len(sample_chemicals)} sample chemicals")
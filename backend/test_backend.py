@@ -1,85 +1,247 @@
-import requests
-import json
+# Backend smoke tests: pytest test_backend.py -n auto --dist=loadscope
+# (loadscope keeps this module on one xdist worker, so the session fixtures - app or
+# connection, registered user - are set up once instead of once per worker)
+# In-process through the ASGI app by default; --live sends them to a running server instead
+import argparse
+import asyncio
+import csv
+import time
+import uuid
+from urllib.parse import urlencode
+import httpx
+import numpy as np
+import orjson
+import pytest
 
-BASE_URL = "http://localhost:8000"
+# IPv4 loopback directly: no name lookup, and no failed ::1 attempt when uvicorn binds IPv4 only
+BASE_URL = "http://127.0.0.1:8000"
+FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+JSON_HEADERS = {"Content-Type": "application/json"}
+# Connection attempts retried with exponential backoff, to ride out a backend still starting up
+CONNECT_RETRIES = 3
 
-def test_backend_health():
-    """Test if backend is running"""
-    try:
-        response = requests.get(f"{BASE_URL}/health")
-        print(f"✅ Health check: {response.status_code} - {response.json()}")
-        return True
-    except Exception as e:
-        print(f"❌ Backend not reachable: {e}")
-        return False
-
-def test_database_connection():
-    """Test database connection"""
+def _import_app():
+    """app.main's FastAPI app; skips only when a third-party dependency is not installed"""
     try:
-        response = requests.get(f"{BASE_URL}/test-db")
-        print(f"✅ Database test: {response.status_code} - {response.json()}")
-        return True
-    except Exception as e:
-        print(f"❌ Database test failed: {e}")
-        return False
-
-def test_user_registration():
-    """Test user registration directly"""
+        from app.main import app
+    except ModuleNotFoundError as e:
+        if e.name and e.name.split(".")[0] != "app":
+            pytest.skip(f"Backend dependency not installed: {e.name}")
+        raise
+    return app
+
+@pytest.fixture(scope="session")
+def client(request, tmp_path_factory):
+    """One client per test session (per xdist worker), so app start-up or the connection is reused"""
+    if not request.config.getoption("--live"):
+        app = _import_app()
+        from fastapi.testclient import TestClient
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from app.database import Base, get_db
+
+        # Throwaway SQLite database, so test users never reach the developer's DATABASE_URL
+        engine = create_engine(
+            f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}",
+            connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(bind=engine)
+        TestingSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def get_test_db():
+            db = TestingSession()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = get_test_db
+        try:
+            # No sockets: requests are handed straight to the app's ASGI interface
+            with TestClient(app) as client:
+                yield client
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            Base.metadata.drop_all(bind=engine)
+            engine.dispose()
+        return
+    
+    transport = httpx.HTTPTransport(retries=CONNECT_RETRIES)
+    with httpx.Client(base_url=BASE_URL, transport=transport) as client:
+        try:
+            client.get("/health")
+        except httpx.TransportError as e:
+            pytest.skip(f"Backend not reachable at {BASE_URL}: {e}")
+        yield client
+
+@pytest.fixture(scope="session")
+def registered_user(client):
+    """Register a fresh user; tests that need an account depend on this instead of on each other"""
     user_data = {
-        "email": "test@lab.com",
+        # Unique per session so reruns and parallel workers don't collide
+        "email": f"test-{uuid.uuid4().hex[:12]}@lab.com",
         "password": "test123",
         "full_name": "Test User",
         "role": "admin"
     }
-    
-    try:
-        response = requests.post(f"{BASE_URL}/auth/register", json=user_data)
-        print(f"✅ Registration test: {response.status_code}")
-        if response.status_code == 200:
-            print(f"   User created: {response.json()}")
-        else:
-            print(f"   Error: {response.json()}")
-        return response.status_code == 200
-    except Exception as e:
-        print(f"❌ Registration failed: {e}")
-        return False
-
-def test_user_login():
+    response = client.post("/auth/register", content=orjson.dumps(user_data), headers=JSON_HEADERS)
+    assert response.status_code == 200, response.text
+    return user_data, orjson.loads(response.content)
+
+@pytest.fixture(scope="session")
+def login_body(registered_user):
+    """The registered user's login form, urlencoded once and reused for every login"""
+    user_data, _ = registered_user
+    return urlencode({"username": user_data["email"], "password": user_data["password"]}).encode("ascii")
+
+def test_backend_health(client):
+    """Test if backend is running"""
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert orjson.loads(response.content)["status"] == "healthy"
+
+def test_database_connection(client):
+    """Test database connection"""
+    response = client.get("/test-db")
+    assert response.status_code == 200
+    assert orjson.loads(response.content)["database_status"] == "connected"
+
+def test_user_registration(registered_user):
+    """Test user registration directly"""
+    user_data, created = registered_user
+    assert created["email"] == user_data["email"]
+    # Self-registration never grants admin
+    assert created["role"] == "viewer"
+
+def test_user_login(client, login_body):
     """Test user login directly"""
-    login_data = {
-        "username": "test@lab.com",
-        "password": "test123"
-    }
-    
-    try:
-        response = requests.post(
-            f"{BASE_URL}/auth/login",
-            data=login_data,
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
-        )
-        print(f"✅ Login test: {response.status_code}")
-        if response.status_code == 200:
-            print(f"   Login successful: {response.json()}")
-        else:
-            print(f"   Error: {response.json()}")
-        return response.status_code == 200
-    except Exception as e:
-        print(f"❌ Login failed: {e}")
-        return False
+    response = client.post("/auth/login", content=login_body, headers=FORM_HEADERS)
+    assert response.status_code == 200, response.text
+    token = orjson.loads(response.content)
+    assert token["token_type"] == "bearer"
+    assert token["access_token"]
+
+def _report(latencies: np.ndarray, statuses: np.ndarray, elapsed: float):
+    """Print throughput, failures and latency percentiles; status 0 marks a transport error"""
+    failures = int(np.count_nonzero(statuses != 200))
+    p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+    print(f"   {len(latencies) / elapsed:.0f} req/s over {elapsed:.2f} s, {failures} failed")
+    print(f"   p50 {p50:.1f} ms | p95 {p95:.1f} ms | p99 {p99:.1f} ms")
+
+async def _timed_request(client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                         latencies: np.ndarray, statuses: np.ndarray, index: int,
+                         method: str, url: str, **kwargs):
+    """Send one request, recording its latency and status at ``index``"""
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            statuses[index] = response.status_code
+        except httpx.HTTPError:
+            statuses[index] = 0
+        latencies[index] = time.perf_counter() - start
+
+def _load_client(concurrency: int) -> httpx.AsyncClient:
+    # Enough pooled keep-alive connections that no request waits on the pool
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    return httpx.AsyncClient(base_url=BASE_URL, limits=limits)
+
+async def _warmup(client: httpx.AsyncClient, connections: int):
+    """
+    Open up to ``connections`` pooled connections with untimed /health requests, so the
+    timed run measures steady state rather than connection setup and first-request work
+    """
+    results = await asyncio.gather(
+        *(client.get("/health", timeout=5) for _ in range(connections)),
+        return_exceptions=True
+    )
+    if all(isinstance(result, Exception) for result in results):
+        raise SystemExit(f"Backend not reachable at {BASE_URL}: {results[0]}")
+
+async def load_smoke(n: int = 1000, concurrency: int = 200):
+    """Hit /health ``n`` times with at most ``concurrency`` requests in flight and report latency percentiles"""
+    print(f"🔥 Load smoke: {n} requests to /health, concurrency {concurrency}")
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = np.empty(n)
+    statuses = np.empty(n, dtype=np.int16)
+
+    async with _load_client(concurrency) as client:
+        await _warmup(client, min(concurrency, n))
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _timed_request(client, semaphore, latencies, statuses, index, "GET", "/health")
+            for index in range(n)
+        ))
+        elapsed = time.perf_counter() - start
+
+    _report(latencies, statuses, elapsed)
+
+# Stress requests are released in windows of this many seconds
+STRESS_WINDOW_S = 5
+
+def _load_login_bodies(path: str) -> list:
+    """Urlencoded login forms from a CSV with email,password rows (a header row is skipped)"""
+    with open(path, newline="") as handle:
+        rows = [row for row in csv.reader(handle) if len(row) >= 2]
+    if rows and rows[0][0].strip().lower() in ("email", "username"):
+        rows = rows[1:]
+    return [
+        urlencode({"username": email.strip(), "password": password}).encode("ascii")
+        for email, password, *_ in rows
+    ]
+
+async def stress(credentials_csv: str, rate_rps: int, duration_s: int, concurrency: int = 200):
+    """
+    Sustained /auth/login load: ``rate_rps * duration_s`` logins cycling through the CSV
+    credentials, released in STRESS_WINDOW_S-second windows
+    """
+    bodies = _load_login_bodies(credentials_csv)
+    if not bodies:
+        raise SystemExit(f"No credentials found in {credentials_csv}")
+    total = rate_rps * duration_s
+    per_window = rate_rps * STRESS_WINDOW_S
+    print(f"🔥 Stress: {total} logins at {rate_rps} req/s for {duration_s} s, "
+          f"{len(bodies)} accounts, concurrency {concurrency}")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = np.empty(total)
+    statuses = np.empty(total, dtype=np.int16)
+    tasks = []
+
+    async with _load_client(concurrency) as client:
+        await _warmup(client, min(concurrency, per_window))
+        start = time.perf_counter()
+        for window, first in enumerate(range(0, total, per_window)):
+            # Open loop: each window starts on schedule whether or not earlier ones finished
+            delay = start + window * STRESS_WINDOW_S - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.extend(
+                asyncio.create_task(_timed_request(
+                    client, semaphore, latencies, statuses, index, "POST", "/auth/login",
+                    content=bodies[index % len(bodies)], headers=FORM_HEADERS
+                ))
+                for index in range(first, min(first + per_window, total))
+            )
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    _report(latencies, statuses, elapsed)
 
 if __name__ == "__main__":
-    print("🔍 Testing Backend Connection...")
-    print("=" * 50)
-    
-    # Run tests
-    health_ok = test_backend_health()
-    db_ok = test_database_connection()
-    
-    if health_ok and db_ok:
-        print("\n🔍 Testing Authentication...")
-        reg_ok = test_user_registration()
-        if reg_ok:
-            login_ok = test_user_login()
-        
-    print("=" * 50)
-    print("🎯 Backend Test Complete")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load tools; run the checks themselves with pytest")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--concurrency", type=int, default=200, help="requests in flight")
+    modes = parser.add_subparsers(dest="mode", required=True)
+    smoke_parser = modes.add_parser("smoke", parents=[common], help="burst of /health requests")
+    smoke_parser.add_argument("n", type=int, help="number of requests")
+    stress_parser = modes.add_parser("stress", parents=[common], help="paced /auth/login load from a credentials CSV")
+    stress_parser.add_argument("credentials_csv", help="CSV of email,password rows")
+    stress_parser.add_argument("--rate", type=int, default=20, help="logins per second")
+    stress_parser.add_argument("--duration", type=int, default=30, help="seconds of load")
+    args = parser.parse_args()
+
+    if args.mode == "smoke":
+        asyncio.run(load_smoke(args.n, args.concurrency))
+    else:
+        asyncio.run(stress(args.credentials_csv, args.rate, args.duration, args.concurrency))
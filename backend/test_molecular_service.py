@@ -0,0 +1,124 @@
+# Test MolecularService's RDKit paths
+import pytest
+
+pytest.importorskip("rdkit")
+
+from app.services.molecular_service import get_molecular_service
+from app.utils.chemical_utils import BATCH_PROCESS_THRESHOLD
+
+ASPIRIN_SMILES = "CC(=O)Oc1ccccc1C(=O)O"
+BATCH_SMILES = [
+    ASPIRIN_SMILES, "CCO", "CC(=O)C", "c1ccncc1", "O=[N+]([O-])c1ccccc1",
+    "[Na+].[Cl-]", "CN1C=NC2=C1C(=O)N(C(=O)N2C)C", "OC[C@H]1OC(O)[C@H](O)[C@@H](O)[C@@H]1O",
+]
+
+@pytest.fixture(scope="session")
+def service():
+    """The shared service; these tests are only meaningful when RDKit initialised"""
+    service = get_molecular_service()
+    assert service.rdkit_available
+    return service
+
+def test_rdkit_path(service):
+    properties = service.calculate_molecular_properties("CCO")
+    assert properties.calculation_source == "rdkit"
+    assert properties.molecular_formula == "C2H6O"
+    assert properties.inchikey == "LFQSCWFLJHTTHZ-UHFFFAOYSA-N"
+
+def test_properties_cached_by_canonical_smiles(service):
+    # Different spellings of ethanol share one cached result
+    assert service.calculate_molecular_properties("OCC") is service.calculate_molecular_properties("CCO")
+
+def test_aspirin_descriptors(service):
+    # Pins the single rdMolDescriptors.Properties pass against known values
+    properties = service.calculate_molecular_properties(ASPIRIN_SMILES)
+    assert properties.molecular_formula == "C9H8O4"
+    assert properties.logp == pytest.approx(1.31)
+    assert properties.tpsa == pytest.approx(63.6)
+    assert properties.hydrogen_bond_donors == 1
+    assert properties.hydrogen_bond_acceptors == 3
+    assert properties.rotatable_bonds == 2
+    assert properties.heavy_atom_count == 13
+    assert properties.ring_count == 1
+    assert properties.aromatic_rings == 1
+
+# 2 workers stays on threads; 4 workers at BATCH_PROCESS_THRESHOLD takes the process pool
+@pytest.mark.parametrize("n_workers", [2, 4])
+def test_batch(service, n_workers):
+    copies = BATCH_PROCESS_THRESHOLD // len(BATCH_SMILES) + 1
+    smiles_list = BATCH_SMILES * copies
+    
+    results = service.calculate_molecular_properties_batch(smiles_list, n_workers=n_workers)
+    
+    assert len(results) == len(smiles_list)
+    # The batch paths must agree with one-at-a-time processing
+    for smiles, computed in zip(smiles_list, results):
+        assert computed.calculation_source == "rdkit"
+        assert computed == service.calculate_molecular_properties(smiles)
+
+ETHANOL_INCHI = "InChI=1S/C2H6O/c1-2-3/h3H,2H2,1H3"
+
+@pytest.mark.parametrize("input_data,input_format,output_format,expected", [
+    ("OCC", "smiles", "smiles", "CCO"),
+    ("OCC", "SMILES", "inchi", ETHANOL_INCHI),
+    ("OCC", "smiles", "inchikey", "LFQSCWFLJHTTHZ-UHFFFAOYSA-N"),
+    (ETHANOL_INCHI, "inchi", "smiles", "CCO"),
+    ("not a smiles", "smiles", "inchi", None),
+])
+def test_convert_format(service, input_data, input_format, output_format, expected):
+    assert service.convert_format(input_data, input_format, output_format) == expected
+
+def test_convert_format_cached(service):
+    service.convert_format("c1ccncc1", "smiles", "inchi")
+    hits = service._convert_cached.cache_info().hits
+    # Format names are lower-cased before the cache lookup
+    assert service.convert_format("c1ccncc1", "SMILES", "InChI") == "InChI=1S/C5H5N/c1-2-4-6-5-3-1/h1-5H"
+    assert service._convert_cached.cache_info().hits == hits + 1
+
+def test_optimize_structure_2d_only(service):
+    result = service.optimize_structure("OCC")
+    assert result["canonical_smiles"] == "CCO"
+    assert result["has_3d_coordinates"] is False
+    assert result["optimization_method"] is None
+
+def test_optimize_structure_3d_leaves_cached_mol(service):
+    result = service.optimize_structure("CCO", generate_3d=True)
+    assert result["has_3d_coordinates"] is True
+    assert result["optimization_method"] == "UFF"
+    # Embedding works on an AddHs copy; the shared parse keeps no Hs and no conformer
+    mol = service._parse_mol("CCO")[0]
+    assert mol.GetNumAtoms() == 3
+    assert mol.GetNumConformers() == 0
+    assert service.render_2d("CCO").lstrip().startswith("<?xml")
+    assert mol.GetNumConformers() == 0
+
+@pytest.mark.parametrize("smiles", BATCH_SMILES)
+def test_crippen_descriptors_match_rdkit(service, smiles):
+    from rdkit import Chem
+    from rdkit.Chem import rdMolDescriptors
+    mol = Chem.MolFromSmiles(smiles)
+    logp, mr = rdMolDescriptors.CalcCrippenDescriptors(mol)
+    properties = service.calculate_molecular_properties(smiles)
+    assert properties.logp == round(logp, 2)
+    assert properties.molar_refractivity == round(mr, 2)
+    assert service.validate_structure(smiles)["heavy_atom_count"] == mol.GetNumHeavyAtoms()
+
+@pytest.mark.parametrize("smiles", ["c1ccccc1", "c1ccncc1", "c1ccoc1"])
+def test_validate_aromatic_smiles(service, smiles):
+    # All-aromatic SMILES have no upper-case atoms and must still reach RDKit
+    assert service.validate_structure(smiles)["is_valid"]
+
+def test_properties_immutable(service):
+    import dataclasses
+    properties = service.calculate_molecular_properties(ASPIRIN_SMILES)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        properties.logp = 0.0
+    # Hashable, so it can key downstream caches
+    assert {properties: True}[service.calculate_molecular_properties(ASPIRIN_SMILES)]
+
+def test_compound_summary(service):
+    summary = service.get_compound_summary(ASPIRIN_SMILES)
+    assert summary["summary"] == {"is_valid": True, "has_properties": True, "data_quality": "high"}
+    # RDKit results carry no fallback note, so to_dict leaves it out
+    assert "note" not in summary["properties"]
+    assert summary["properties"]["inchikey"] == "BSYNRYMUTXBXSQ-UHFFFAOYSA-N"
@@ -1,11 +1,64 @@
 # Test chemical processing
-from app.utils.chemical_utils import process_chemical_data
+import pytest
 
-# Test with aspirin
-result = process_chemical_data(
-    "CC(=O)Oc1ccccc1C(=O)O", 
-    "Aspirin", 
-    "50-78-2"
+from app.utils.chemical_utils import (
+    BATCH_PROCESS_THRESHOLD, process_chemical_data, process_chemicals_batch
 )
-print(result)
-# Should return canonical SMILES, InChIKey, formula, and molecular weight
\ No newline at end of file
+
+ASPIRIN = ("CC(=O)Oc1ccccc1C(=O)O", "Aspirin", "50-78-2")
+ASPIRIN_INCHIKEY = "BSYNRYMUTXBXSQ-UHFFFAOYSA-N"
+
+# (SMILES, name, CAS) covering neutral organics, aromatics, salts and stereocentres
+MOLECULES = [
+    ASPIRIN,
+    ("CCO", "Ethanol", "64-17-5"),
+    ("CC(=O)C", "Acetone", "67-64-1"),
+    ("c1ccncc1", "Pyridine", "110-86-1"),
+    ("O=[N+]([O-])c1ccccc1", "Nitrobenzene", "98-95-3"),
+    ("[Na+].[Cl-]", "Sodium Chloride", "7647-14-5"),
+    ("CN1C=NC2=C1C(=O)N(C(=O)N2C)C", "Caffeine", "58-08-2"),
+    ("OC[C@H]1OC(O)[C@H](O)[C@@H](O)[C@@H]1O", "Glucose", "50-99-7"),
+]
+
+@pytest.fixture(scope="session")
+def aspirin_result():
+    """Aspirin processed once per session and shared by every test that needs it"""
+    return process_chemical_data(*ASPIRIN)
+
+def test_aspirin_canonicalisation(aspirin_result):
+    # Should return canonical SMILES, InChIKey, formula, and molecular weight
+    assert aspirin_result["canonical_smiles"] == "CC(=O)Oc1ccccc1C(=O)O"
+    assert aspirin_result["inchikey"] == ASPIRIN_INCHIKEY
+    assert aspirin_result["molecular_formula"] == "C9H8O4"
+    assert aspirin_result["molecular_weight"] == pytest.approx(180.16, abs=0.01)
+    assert aspirin_result["name"] == "Aspirin"
+    assert aspirin_result["cas_number"] == "50-78-2"
+
+@pytest.mark.parametrize("smiles,name,cas_number", MOLECULES)
+def test_process_chemical_data(smiles, name, cas_number):
+    result = process_chemical_data(smiles, name, cas_number)
+    assert result["canonical_smiles"]
+    assert result["inchikey"] and not result["inchikey"].startswith("INCHIKEY-")
+    assert result["molecular_formula"]
+    assert result["molecular_weight"] > 0
+
+def test_batch():
+    # Large enough to take the multithreaded RDKit supplier path
+    copies = BATCH_PROCESS_THRESHOLD // len(MOLECULES) + 1
+    smiles_list = [smiles for smiles, _, _ in MOLECULES] * copies
+    
+    results = process_chemicals_batch(smiles_list)
+    
+    assert len(results) == len(smiles_list)
+    assert results[0][1] == ASPIRIN_INCHIKEY
+    # The batch path must agree with one-at-a-time processing
+    for (smiles, name, cas_number), computed in zip(MOLECULES * copies, results):
+        single = process_chemical_data(smiles, name, cas_number)
+        assert computed == (
+            single["canonical_smiles"], single["inchikey"],
+            single["molecular_formula"], single["molecular_weight"]
+        )
+
+if __name__ == "__main__":
+    # Test with aspirin
+    print(process_chemical_data(*ASPIRIN))
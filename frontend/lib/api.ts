@@ -357,6 +357,11 @@ export const barcodesAPI = {
     return response.data;
   },
   
+  getBarcodeImage: async (barcodeId: number): Promise<Blob> => {
+    const response = await api.get(`/barcodes/${barcodeId}/image`, { responseType: 'blob' });
+    return response.data;
+  },
+  
   scanBarcode: async (barcodeData: string): Promise<ChemicalWithStock> => {
     const response = await api.get(`/barcodes/scan/${encodeURIComponent(barcodeData)}`);
     return response.data;
@@ -70,7 +70,6 @@ export interface BarcodeImage {
   chemical_id: number;
   barcode_type: 'code128' | 'qr';
   barcode_data: string;
-  image_blob: string | null;
   image_path: string | null;
   created_at: string;
 }